@@ -0,0 +1,74 @@
+# app/api/admin.py
+from fastapi import APIRouter, Depends
+
+from app.api.routing import UnitOfWorkRoute
+from app.auth import cache as auth_cache
+from app.auth.hashing import password_hasher
+from app.auth.revocation import revocations
+from app.certificates.rendering import certificate_renderer
+from app.db.queries import compiled_cache_stats
+from app.gamification.answer_keys import answer_keys
+from app.outbox.worker import outbox_worker
+from app.reporting.jobs import report_jobs
+from app.db.session import created_async_engines, engine, replica_engine
+from app.db.versions import versions
+from app.auth.deps import require_roles
+from app.users_org.models import UserRole
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_roles(UserRole.ADMIN, UserRole.SUPER_ADMIN))],
+    route_class=UnitOfWorkRoute,
+)
+
+
+@router.get("/auth-cache", summary="Token and user cache statistics")
+def auth_cache_stats():
+    return {**auth_cache.stats(), "revocations": revocations.stats()}
+
+
+@router.get("/password-hashing", summary="Password hashing pool statistics")
+def password_hashing_stats():
+    return password_hasher.stats()
+
+
+@router.get("/db-pool", summary="Connection pool statistics")
+def db_pool_stats():
+    stats = {"primary": engine.pool.stats()}
+    async_primary = created_async_engines().get("primary")
+    if async_primary is not None:
+        stats["async"] = async_primary.sync_engine.pool.stats()
+    if replica_engine is not engine:
+        stats["replica"] = replica_engine.pool.stats()
+    return stats
+
+
+@router.get("/sql-cache", summary="Compiled SQL cache statistics")
+def sql_cache_stats():
+    return compiled_cache_stats.stats()
+
+
+@router.get("/quiz-answer-keys", summary="Quiz answer-key cache statistics")
+def quiz_answer_key_stats():
+    return answer_keys.stats()
+
+
+@router.get("/outbox", summary="Outbox worker statistics")
+def outbox_stats():
+    return outbox_worker.stats()
+
+
+@router.get("/certificate-rendering", summary="Certificate rendering pool and file cache statistics")
+def certificate_rendering_stats():
+    return certificate_renderer.stats()
+
+
+@router.get("/resource-versions", summary="ETag version cache statistics")
+def resource_version_stats():
+    return versions.stats()
+
+
+@router.get("/report-jobs", summary="Report job pool statistics")
+def report_job_stats():
+    return report_jobs.stats()
@@ -0,0 +1,26 @@
+# app/api/conditional.py
+import hashlib
+
+from fastapi import Request, Response, status
+
+# Clients may cache but must revalidate with If-None-Match on every use
+REVALIDATE = "private, no-cache"
+
+
+def resource_etag(request: Request, key: str, version: int) -> str:
+    """ETag for one version of a resource, varying with the query string (filters, cursor)."""
+    digest = hashlib.sha1(f"{key}:{version}:{request.url.query}".encode("utf-8")).hexdigest()
+    return f'"{digest[:24]}"'
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": REVALIDATE},
+    )
+
+
+def set_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
+    return response
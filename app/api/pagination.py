@@ -0,0 +1,68 @@
+# app/api/pagination.py
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response, status
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+class PageParams:
+    """
+    Keyset pagination parameters shared by list endpoints. Pages are ordered
+    by primary key (ids grow with creation time); the cursor for the next
+    page is returned in the X-Next-Cursor response header.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Value of a previous X-Next-Cursor header"),
+    ):
+        self.limit = limit
+        self.after_id = decode_cursor(cursor) if cursor else None
+
+
+def paginate(query: Any, id_column: Any, page: PageParams) -> Any:
+    """
+    Restrict a Query or Select to one page. One extra row is fetched so
+    finish_page can tell whether a next page exists.
+    """
+    if page.after_id is not None:
+        query = query.filter(id_column > page.after_id)
+    return query.order_by(id_column).limit(page.limit + 1)
+
+
+def split_page(rows: Sequence[Any], page: PageParams) -> Tuple[List[Any], Optional[str]]:
+    """Drop the look-ahead row and return the cursor of the next page, if any."""
+    rows = list(rows)
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        return rows, encode_cursor(rows[-1].id)
+    return rows, None
+
+
+def finish_page(rows: Sequence[Any], page: PageParams, response: Response) -> List[Any]:
+    rows, next_cursor = split_page(rows, page)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
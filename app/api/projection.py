@@ -0,0 +1,32 @@
+# app/api/projection.py
+from typing import Any, List, Sequence, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.api.pagination import NEXT_CURSOR_HEADER, PageParams, split_page
+
+
+def projection_columns(schema: Type[BaseModel], model: Any) -> List[Any]:
+    """
+    Model columns backing the fields of a response schema, in field order.
+    Selecting only these avoids hydrating full ORM objects.
+    """
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def json_rows(rows: Sequence[Any]) -> bytes:
+    # orjson encodes datetimes and (str) enums the same way the schemas do
+    return orjson.dumps([row._asdict() for row in rows])
+
+
+def json_page_response(rows: Sequence[Any], page: PageParams) -> Response:
+    """
+    Serialize one page of projected rows straight to JSON bytes, bypassing
+    response_model validation. Endpoints keep declaring response_model so the
+    OpenAPI schema is unchanged.
+    """
+    rows, next_cursor = split_page(rows, page)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor is not None else None
+    return Response(content=json_rows(rows), media_type="application/json", headers=headers)
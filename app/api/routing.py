@@ -0,0 +1,39 @@
+# app/api/routing.py
+from typing import Callable
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# request.state attribute listing the sessions opened by get_db / get_async_db
+REQUEST_SESSIONS = "db_sessions"
+
+
+async def commit_request_sessions(request: Request) -> None:
+    for db in getattr(request.state, REQUEST_SESSIONS, ()):
+        if not db.in_transaction():
+            continue
+        if isinstance(db, AsyncSession):
+            await db.commit()
+        else:
+            await run_in_threadpool(db.commit)
+
+
+class UnitOfWorkRoute(APIRoute):
+    """
+    Commits the request's sessions once the endpoint has returned, before the
+    response is sent. Depending on the FastAPI version, dependency teardown
+    runs only after the response went out, so a commit there could fail
+    behind a success status the client already has.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            response = await handler(request)
+            await commit_request_sessions(request)
+            return response
+
+        return route_handler
@@ -0,0 +1,102 @@
+# app/auth/cache.py
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from app.auth.security import decode_access_token
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.users_org.models import User, UserRole
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Compact identity record returned by get_current_user instead of the ORM row."""
+
+    id: int
+    email: str
+    full_name: str
+    role: UserRole
+    department_id: Optional[int]
+    is_active: bool
+    token_version: int
+
+
+@dataclass(frozen=True)
+class TokenEntry:
+    claims: dict
+    user_id: Optional[int] = None
+
+
+token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def get_token_entry(token: str) -> TokenEntry:
+    """
+    Return the verified claims for a token, decoding it only on a cache miss.
+    Invalid tokens raise and are never cached.
+    """
+    digest = token_digest(token)
+    entry = token_cache.get(digest)
+    if entry is not None:
+        return entry
+
+    claims = decode_access_token(token)
+    entry = TokenEntry(claims=claims)
+    token_cache.set(digest, entry, ttl_seconds=_seconds_until_expiry(claims))
+    return entry
+
+
+def remember_token_user(token: str, entry: TokenEntry, user_id: int) -> None:
+    if entry.user_id == user_id:
+        return
+    token_cache.set(
+        token_digest(token),
+        TokenEntry(claims=entry.claims, user_id=user_id),
+        ttl_seconds=_seconds_until_expiry(entry.claims),
+    )
+
+
+def get_cached_user(user_id: int) -> Optional[CachedUser]:
+    return user_cache.get(user_id)
+
+
+def cache_user(user: User) -> CachedUser:
+    cached = CachedUser(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        department_id=user.department_id,
+        is_active=user.is_active,
+        token_version=user.token_version or 0,
+    )
+    user_cache.set(user.id, cached)
+    return cached
+
+
+def invalidate_user(user_id: int) -> None:
+    """
+    Drop the cached identity of a user, e.g. after deactivation or a role change.
+    Cached tokens of that user are re-resolved against the database on next use.
+    """
+    user_cache.pop(user_id)
+
+
+def stats() -> dict:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+
+def _seconds_until_expiry(claims: dict) -> Optional[float]:
+    exp = claims.get("exp")
+    if exp is None:
+        return None
+    return float(exp) - time.time()
@@ -1,57 +1,230 @@
 # app/auth/deps.py
-from fastapi import Depends, HTTPException, status
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.api.routing import REQUEST_SESSIONS
+from app.db import queries
+from app.db.session import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    SessionLocal,
+    get_async_engine,
+    get_async_replica_engine,
+)
 from app.users_org import models
-from app.auth.security import decode_access_token
+from app.auth import cache as auth_cache
+from app.auth.revocation import revocations
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Set on responses to writes; while present, read-only sessions use the primary
+READ_PRIMARY_COOKIE = "read_primary"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+
+@dataclass(frozen=True)
+class TokenPrincipal:
+    """Identity taken from signed token claims, without a database lookup."""
+
+    user_id: int
+    email: str
+    role: models.UserRole
+
+
+def _register(request: Request, db) -> None:
+    sessions = getattr(request.state, REQUEST_SESSIONS, None)
+    if sessions is None:
+        sessions = []
+        setattr(request.state, REQUEST_SESSIONS, sessions)
+    sessions.append(db)
+
 
-def get_db():
+def get_db(request: Request):
+    """
+    Request-scoped unit of work. Handlers add and flush; UnitOfWorkRoute
+    commits once the endpoint returns and before the response is sent. The
+    teardown rolls back on errors and commits anything a route outside
+    UnitOfWorkRoute left open.
+    """
     db = SessionLocal()
+    _register(request, db)
     try:
         yield db
+        if db.in_transaction():
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> models.User:
-    credentials_exception = HTTPException(
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        _register(request, db)
+        try:
+            yield db
+            if db.in_transaction():
+                await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+def _reads_from_primary(request: Request) -> bool:
+    return READ_PRIMARY_COOKIE in request.cookies or READ_PRIMARY_HEADER in request.headers
+
+
+def get_read_db(request: Request):
+    """
+    Session for read-only endpoints. Uses the replica when one is configured,
+    unless the client wrote recently (read-your-writes) or sends X-Read-Primary.
+    """
+    db = SessionLocal() if _reads_from_primary(request) else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    if _reads_from_primary(request):
+        session = AsyncSessionLocal(bind=get_async_engine())
+    else:
+        session = AsyncReadSessionLocal(bind=get_async_replica_engine())
+    async with session as db:
+        yield db
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _decoded_entry(token: str) -> auth_cache.TokenEntry:
     try:
-        payload = decode_access_token(token)
+        entry = auth_cache.get_token_entry(token)
     except Exception:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    if entry.claims.get("sub") is None:
+        raise _credentials_exception()
+    return entry
+
 
-    email: str = payload.get("sub")
-    if email is None:
-        raise credentials_exception
+def _verified_entry(token: str) -> auth_cache.TokenEntry:
+    entry = _decoded_entry(token)
+    uid: Optional[int] = entry.claims.get("uid")
+    if uid is not None and revocations.is_revoked(uid, entry.claims.get("ver", 0)):
+        raise _credentials_exception()
+    return entry
 
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user or not user.is_active:
-        raise credentials_exception
 
-    return user
+async def _verified_entry_async(token: str) -> auth_cache.TokenEntry:
+    entry = _decoded_entry(token)
+    uid: Optional[int] = entry.claims.get("uid")
+    if uid is not None and await revocations.is_revoked_async(uid, entry.claims.get("ver", 0)):
+        raise _credentials_exception()
+    return entry
+
+
+def _check_active(cached: auth_cache.CachedUser, entry: auth_cache.TokenEntry) -> auth_cache.CachedUser:
+    if not cached.is_active or entry.claims.get("ver", 0) < cached.token_version:
+        raise _credentials_exception()
+    return cached
+
+
+def _cached_user(entry: auth_cache.TokenEntry) -> Optional[auth_cache.CachedUser]:
+    user_id = entry.user_id or entry.claims.get("uid")
+    if user_id is None:
+        return None
+    cached = auth_cache.get_cached_user(user_id)
+    if cached is None or cached.email != entry.claims["sub"]:
+        return None
+    return _check_active(cached, entry)
+
+
+def _remember_user(
+    token: str, entry: auth_cache.TokenEntry, user: Optional[models.User]
+) -> auth_cache.CachedUser:
+    if not user:
+        raise _credentials_exception()
+    cached = auth_cache.cache_user(user)
+    auth_cache.remember_token_user(token, entry, user.id)
+    return _check_active(cached, entry)
+
+
+def _resolve_user(token: str, entry: auth_cache.TokenEntry, db: Session) -> auth_cache.CachedUser:
+    cached = _cached_user(entry)
+    if cached is not None:
+        return cached
+
+    user = queries.user_by_email(db, entry.claims["sub"])
+    return _remember_user(token, entry, user)
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> auth_cache.CachedUser:
+    return _resolve_user(token, _verified_entry(token), db)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> auth_cache.CachedUser:
+    """get_current_user for native async endpoints using the async session."""
+    entry = await _verified_entry_async(token)
+    cached = _cached_user(entry)
+    if cached is not None:
+        return cached
+
+    result = await db.scalars(queries.USER_BY_EMAIL, {"email": entry.claims["sub"]})
+    return _remember_user(token, entry, result.first())
+
+
+def get_token_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> TokenPrincipal:
+    """
+    Stateless identity for authorization: trusts the signed uid/role/ver claims
+    and only checks the in-process revocation snapshot. Tokens issued before
+    those claims existed fall back to a regular user lookup.
+    """
+    entry = _verified_entry(token)
+    claims = entry.claims
+
+    if claims.get("uid") is None or claims.get("role") is None:
+        user = _resolve_user(token, entry, db)
+        return TokenPrincipal(user_id=user.id, email=user.email, role=user.role)
+
+    try:
+        role = models.UserRole(claims["role"])
+    except ValueError:
+        raise _credentials_exception()
+
+    return TokenPrincipal(user_id=claims["uid"], email=claims["sub"], role=role)
 
 
 def require_roles(*allowed_roles: models.UserRole):
-    def role_checker(current_user: models.User = Depends(get_current_user)):
-        if current_user.role not in allowed_roles:
+    def role_checker(principal: TokenPrincipal = Depends(get_token_principal)):
+        if principal.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions",
             )
-        return current_user
+        return principal
 
     return role_checker
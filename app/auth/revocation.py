@@ -0,0 +1,118 @@
+# app/auth/revocation.py
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.users_org.models import User
+
+settings = get_settings()
+
+# Rows are stamped with the writer's clock when the UPDATE runs, not when it
+# commits, so each reload re-reads this much history before the watermark.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+class TokenRevocations:
+    """
+    In-process snapshot of the current token version of every user whose
+    tokens were ever revoked (token_version > 0), and of the inactive users.
+    A token carrying an older version, or belonging to an inactive user, is
+    rejected. The snapshot is refreshed from the database at most
+    once per ``refresh_seconds``, which bounds how long a deactivation or role
+    change made by another worker takes to apply; local revocations apply
+    immediately. Only the first load reads every revoked or inactive user;
+    later refreshes read the users updated since the previous one
+    (``users.updated_at``).
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.refreshes = 0
+        self._versions: Dict[int, int] = {}
+        self._inactive: Set[int] = set()
+        self._loaded_at: float = float("-inf")
+        self._watermark: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def is_revoked(self, user_id: int, token_version: int) -> bool:
+        self._refresh_if_stale()
+        return user_id in self._inactive or token_version < self._versions.get(user_id, 0)
+
+    async def is_revoked_async(self, user_id: int, token_version: int) -> bool:
+        """is_revoked for the event loop: a due reload runs in the threadpool."""
+        if self._is_stale():
+            await run_in_threadpool(self._refresh_if_stale)
+        return user_id in self._inactive or token_version < self._versions.get(user_id, 0)
+
+    def revoke(self, user_id: int, token_version: int) -> None:
+        with self._lock:
+            if token_version > self._versions.get(user_id, 0):
+                self._versions[user_id] = token_version
+
+    def set_active(self, user_id: int, is_active: bool) -> None:
+        with self._lock:
+            if is_active:
+                self._inactive.discard(user_id)
+            else:
+                self._inactive.add(user_id)
+
+    def stats(self) -> dict:
+        return {
+            "refresh_seconds": self.refresh_seconds,
+            "revoked_users": len(self._versions),
+            "inactive_users": len(self._inactive),
+            "refreshes": self.refreshes,
+        }
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def _refresh_if_stale(self) -> None:
+        if not self._is_stale():
+            return
+        # Only one thread reloads; the others keep using the previous snapshot,
+        # except on the very first load where there is nothing to fall back on.
+        if not self._lock.acquire(blocking=self._loaded_at == float("-inf")):
+            return
+        try:
+            if not self._is_stale():
+                return
+            started = datetime.utcnow()
+            db = SessionLocal()
+            try:
+                query = db.query(User.id, User.token_version, User.is_active)
+                if self._watermark is None:
+                    query = query.filter((User.token_version > 0) | User.is_active.is_(False))
+                else:
+                    query = query.filter(User.updated_at >= self._watermark - WATERMARK_OVERLAP)
+                rows = query.all()
+            finally:
+                db.close()
+            self._apply(rows)
+            self._watermark = started
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+        finally:
+            self._lock.release()
+
+    def _apply(self, rows) -> None:
+        versions = dict(self._versions)
+        inactive = set(self._inactive)
+        for row in rows:
+            if row.token_version > versions.get(row.id, 0):
+                versions[row.id] = row.token_version
+            if row.is_active:
+                inactive.discard(row.id)
+            else:
+                inactive.add(row.id)
+        # swapped whole so readers outside the lock never see a partial update
+        self._versions = versions
+        self._inactive = inactive
+
+
+revocations = TokenRevocations(settings.AUTH_REVOCATION_REFRESH_SECONDS)
@@ -1,27 +1,53 @@
 # app/auth/router.py
+import secrets
 from datetime import timedelta
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
-from app.auth.security import create_access_token, verify_password
+from app.api.routing import UnitOfWorkRoute
+from app.auth.security import UNUSABLE_PASSWORD, create_access_token
+from app.auth.hashing import password_hasher
 from app.auth.deps import get_db
 from app.core.config import get_settings
-from app.users_org import models
+from app.db import queries
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=UnitOfWorkRoute)
 
 settings = get_settings()
 
+_dummy_hash: Optional[str] = None
+
+
+async def _dummy_password_hash() -> str:
+    """
+    Checked instead when the account is unknown or has no password, so every
+    login attempt costs one bcrypt and the response time does not reveal
+    whether the account exists.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await password_hasher.hash(secrets.token_urlsafe())
+    return _dummy_hash
+
 
 @router.post("/login")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = await run_in_threadpool(
+        lambda: queries.user_by_email(db, form_data.username)
+    )
+    usable = user is not None and not user.password_hash.startswith(UNUSABLE_PASSWORD)
+    password_ok = await password_hasher.verify(
+        form_data.password, user.password_hash if usable else await _dummy_password_hash()
+    )
+    # activation is checked only after bcrypt, so it cannot be told apart by timing
+    if not usable or not password_ok or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -32,6 +58,8 @@ def login(
         subject=user.email,
         role=user.role.value,
         expires_delta=access_token_expires,
+        user_id=user.id,
+        token_version=user.token_version or 0,
     )
 
     return {"access_token": access_token, "token_type": "bearer"}
@@ -1,30 +1,51 @@
 # app/auth/security.py
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-
 from app.core.config import get_settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 settings = get_settings()
 
+# Stored for accounts created without a password (e.g. by the HRIS sync)
+UNUSABLE_PASSWORD = "!"
+
+
+@lru_cache()
+def get_pwd_context():
+    # passlib/bcrypt are imported on first use to keep app import cheap
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
-    return pwd_context.verify(plain_password, password_hash)
+    if password_hash.startswith(UNUSABLE_PASSWORD):
+        return False
+    return get_pwd_context().verify(plain_password, password_hash)
+
 
+def create_access_token(
+    subject: str,
+    role: str,
+    expires_delta: Optional[timedelta] = None,
+    user_id: Optional[int] = None,
+    token_version: int = 0,
+) -> str:
+    from jose import jwt
 
-def create_access_token(subject: str, role: str, expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta is None:
         expires_delta = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
 
     expire = datetime.now(timezone.utc) + expires_delta
     to_encode = {"sub": subject, "role": role, "exp": expire}
+    if user_id is not None:
+        to_encode["uid"] = user_id
+        to_encode["ver"] = token_version
 
     encoded_jwt = jwt.encode(
         to_encode,
@@ -35,6 +56,8 @@ def create_access_token(subject: str, role: str, expires_delta: Optional[timedel
 
 
 def decode_access_token(token: str) -> dict:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token,
@@ -0,0 +1,120 @@
+# app/certificates/rendering.py
+"""
+Renders certificates on a process pool into a content-addressed file cache.
+The cache key is a hash of everything that affects the output, so a file is
+rendered once and then served from disk; it doubles as the download ETag.
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.certificates import templates
+from app.core.config import get_settings
+from app.core.files import write_atomically
+
+settings = get_settings()
+
+# Bump when the templates or renderers change so old files are not reused
+RENDERER_VERSION = 1
+
+MEDIA_TYPES = {templates.PDF: "application/pdf", templates.PNG: "image/png"}
+
+
+@dataclass(frozen=True)
+class RenderedCertificate:
+    path: Path
+    digest: str
+    media_type: str
+    size: int
+
+
+class CertificateRenderer:
+    def __init__(self, cache_dir: str, max_workers: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers
+        self.rendered = 0
+        self.cache_hits = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # renders in progress in this process, so concurrent requests share one
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def digest(fmt: str, template_type: str, fields: Dict[str, str]) -> str:
+        key = json.dumps(
+            {"v": RENDERER_VERSION, "format": fmt, "template": template_type, "fields": fields},
+            sort_keys=True,
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def path_for(self, digest: str, fmt: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest}.{fmt}"
+
+    def cached(self, digest: str, fmt: str) -> Optional[RenderedCertificate]:
+        path = self.path_for(digest, fmt)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return None
+        return RenderedCertificate(path=path, digest=digest, media_type=MEDIA_TYPES[fmt], size=size)
+
+    async def render(self, fmt: str, template_type: str, fields: Dict[str, str]) -> RenderedCertificate:
+        if fmt == templates.PNG and not templates.png_supported():
+            raise templates.RenderingUnavailable("PNG certificates require Pillow")
+
+        digest = self.digest(fmt, template_type, fields)
+        hit = self.cached(digest, fmt)
+        if hit is not None:
+            self.cache_hits += 1
+            return hit
+
+        future = self._inflight.get(digest)
+        if future is None:
+            future = asyncio.ensure_future(self._render(digest, fmt, template_type, fields))
+            self._inflight[digest] = future
+            future.add_done_callback(lambda _: self._inflight.pop(digest, None))
+        return await asyncio.shield(future)
+
+    async def _render(self, digest: str, fmt: str, template_type: str, fields: Dict[str, str]) -> RenderedCertificate:
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(self._pool(), templates.render, fmt, template_type, fields)
+        path = self.path_for(digest, fmt)
+        await loop.run_in_executor(None, write_atomically, path, data)
+        self.rendered += 1
+        return RenderedCertificate(path=path, digest=digest, media_type=MEDIA_TYPES[fmt], size=len(data))
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Created on first use, i.e. in the serving process and not a preloading parent
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "rendered": self.rendered,
+            "cache_hits": self.cache_hits,
+            "in_flight": len(self._inflight),
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+certificate_renderer = CertificateRenderer(
+    cache_dir=settings.CERTIFICATE_CACHE_DIR,
+    max_workers=settings.CERTIFICATE_RENDER_WORKERS,
+)
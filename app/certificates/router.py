@@ -1,24 +1,104 @@
 # app/certificates/router.py
-from typing import List
+import enum
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth.deps import get_current_user, get_db
-from app.users_org.models import User
+from app.api.routing import UnitOfWorkRoute
+from app.api.conditional import not_modified, resource_etag, set_etag
+from app.api.files import etag_matches, file_response
+from app.api.pagination import PageParams, finish_page, paginate
+from app.auth.cache import CachedUser
+from app.auth.deps import get_async_read_db, get_current_user_async
+from app.users_org.models import User, UserRole
 from app.certificates import models, schemas
+from app.certificates.rendering import certificate_renderer
+from app.certificates.templates import TEMPLATES, RenderingUnavailable
+from app.db.versions import certificates_key, versions
 
-router = APIRouter(prefix="/certificates", tags=["certificates"])
+router = APIRouter(prefix="/certificates", tags=["certificates"], route_class=UnitOfWorkRoute)
+
+
+class CertificateFormat(str, enum.Enum):
+    PDF = "pdf"
+    PNG = "png"
 
 
 @router.get("/me", response_model=List[schemas.CertificateRead])
-def list_my_certificates(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def list_my_certificates(
+    request: Request,
+    response: Response,
+    template_type: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CachedUser = Depends(get_current_user_async),
+):
+    key = certificates_key(current_user.id)
+    etag = resource_etag(request, key, await versions.get_async(db, key))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    stmt = select(models.Certificate).where(models.Certificate.user_id == current_user.id)
+    if template_type is not None:
+        stmt = stmt.where(models.Certificate.template_type == template_type)
+
+    certs = await db.scalars(paginate(stmt, models.Certificate.id, page))
+    return finish_page(certs.all(), page, response)
+
+
+@router.get("/{certificate_id}/download")
+async def download_certificate(
+    certificate_id: int,
+    request: Request,
+    format: CertificateFormat = CertificateFormat.PDF,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CachedUser = Depends(get_current_user_async),
 ):
-    certs = (
-        db.query(models.Certificate)
-        .filter(models.Certificate.user_id == current_user.id)
-        .all()
+    """
+    Download a rendered certificate. Rendering happens once per distinct
+    content; later downloads (and Range requests) are served from the file cache.
+    """
+    row = (
+        await db.execute(
+            select(models.Certificate, User.full_name)
+            .join(User, User.id == models.Certificate.user_id)
+            .where(models.Certificate.id == certificate_id)
+        )
+    ).first()
+    if row is None or (
+        row.Certificate.user_id != current_user.id
+        and current_user.role not in (UserRole.ADMIN, UserRole.SUPER_ADMIN)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Certificate not found",
+        )
+
+    cert = row.Certificate
+    if cert.template_type not in TEMPLATES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"No template for {cert.template_type}",
+        )
+
+    fields = {
+        "recipient": row.full_name,
+        "meta": cert.meta or "",
+        "issued": f"Certificate #{cert.id} - issued {cert.issued_at:%d %B %Y}",
+    }
+    try:
+        rendered = await certificate_renderer.render(format.value, cert.template_type, fields)
+    except RenderingUnavailable as exc:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc))
+
+    return file_response(
+        request,
+        rendered.path,
+        rendered.size,
+        rendered.media_type,
+        etag=f'"{rendered.digest}"',
+        filename=f"certificate-{cert.id}.{format.value}",
     )
-    return certs
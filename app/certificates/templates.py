@@ -0,0 +1,225 @@
+# app/certificates/templates.py
+"""
+Certificate templates and the renderers that run inside the rendering
+process pool. Only the standard library (and Pillow for PNG)
+is imported here so pool processes start quickly.
+
+A template is parsed once per process: static parts (border, colours,
+title) are turned into ready-made output (PDF content-stream segments or a
+base PNG image) and only the per-certificate fields are filled in on render.
+"""
+import io
+import string
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+PDF = "pdf"
+PNG = "png"
+
+# A4 landscape, in PDF points
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+PNG_SCALE = 2
+
+
+@dataclass(frozen=True)
+class TemplateSpec:
+    title: str
+    accent: Tuple[float, float, float]  # RGB, 0..1
+
+
+TEMPLATES: Dict[str, TemplateSpec] = {
+    "SILVER": TemplateSpec(title="Silver Learner", accent=(0.62, 0.65, 0.69)),
+    "GOLD": TemplateSpec(title="Gold Learner", accent=(0.80, 0.62, 0.18)),
+    "PLATINUM": TemplateSpec(title="Platinum Learner", accent=(0.38, 0.50, 0.58)),
+}
+
+# Text lines: (field, font size, baseline y in points)
+LINES: List[Tuple[str, int, int]] = [
+    ("heading", 18, 450),
+    ("title", 40, 390),
+    ("presented", 14, 330),
+    ("recipient", 30, 285),
+    ("meta", 12, 230),
+    ("issued", 12, 120),
+]
+
+PDF_PAGE_LAYOUT = """q
+{accent} RG 10 w 28 28 786 539 re S
+{accent} RG 2 w 44 44 754 507 re S
+Q
+BT /F1 {heading_size} Tf {heading_x} {heading_y} Td ({heading}) Tj ET
+q {accent} rg BT /F2 {title_size} Tf {title_x} {title_y} Td ({title}) Tj ET Q
+BT /F1 {presented_size} Tf {presented_x} {presented_y} Td ({presented}) Tj ET
+BT /F2 {recipient_size} Tf {recipient_x} {recipient_y} Td ({recipient}) Tj ET
+BT /F1 {meta_size} Tf {meta_x} {meta_y} Td ({meta}) Tj ET
+BT /F1 {issued_size} Tf {issued_x} {issued_y} Td ({issued}) Tj ET
+"""
+
+STATIC_TEXT = {
+    "heading": "Certificate of Achievement",
+    "presented": "This certificate is presented to",
+}
+
+
+class RenderingUnavailable(Exception):
+    """Raised when the requested output format needs an optional dependency."""
+
+
+def _text_width(text: str, size: int) -> float:
+    # Helvetica averages roughly half an em per character
+    return len(text) * size * 0.5
+
+
+def _centered_x(text: str, size: int) -> str:
+    return f"{max((PAGE_WIDTH - _text_width(text, size)) / 2, 48):.1f}"
+
+
+def _pdf_escape(text: str) -> str:
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+@lru_cache(maxsize=None)
+def _pdf_template(template_type: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """
+    Pre-parse the page layout for one template: every placeholder that does not
+    depend on the certificate is resolved, leaving (literal, field) segments.
+    """
+    spec = TEMPLATES[template_type]
+    static = {"accent": "{:.3f} {:.3f} {:.3f}".format(*spec.accent), "title": _pdf_escape(spec.title)}
+    for name, size, y in LINES:
+        static[f"{name}_size"] = str(size)
+        static[f"{name}_y"] = str(y)
+    static["title_x"] = _centered_x(spec.title, 40)
+    sizes = {name: size for name, size, _ in LINES}
+    for name, text in STATIC_TEXT.items():
+        static[name] = _pdf_escape(text)
+        static[f"{name}_x"] = _centered_x(text, sizes[name])
+
+    segments: List[Tuple[str, Optional[str]]] = []
+    literal = ""
+    for text, field, _, _ in string.Formatter().parse(PDF_PAGE_LAYOUT):
+        literal += text
+        if field is None:
+            continue
+        if field in static:
+            literal += static[field]
+        else:
+            segments.append((literal, field))
+            literal = ""
+    segments.append((literal, None))
+    return tuple(segments)
+
+
+def _pdf_document(content: bytes) -> bytes:
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+        "/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>".encode("ascii"),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def render_pdf(template_type: str, fields: Dict[str, str]) -> bytes:
+    sizes = {name: size for name, size, _ in LINES}
+    values: Dict[str, str] = {}
+    for name in ("recipient", "meta", "issued"):
+        text = fields.get(name) or ""
+        values[name] = _pdf_escape(text)
+        values[f"{name}_x"] = _centered_x(text, sizes[name])
+
+    parts = []
+    for literal, field in _pdf_template(template_type):
+        parts.append(literal)
+        if field is not None:
+            parts.append(values[field])
+    return _pdf_document("".join(parts).encode("latin-1"))
+
+
+def _png_font(size: int):
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.load_default(size=size * PNG_SCALE)
+    except TypeError:
+        # Pillow < 10.1 only has a fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=None)
+def _png_template(template_type: str):
+    """Base image with the border and all static text drawn, copied per render."""
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:
+        raise RenderingUnavailable("PNG certificates require Pillow")
+
+    spec = TEMPLATES[template_type]
+    accent = tuple(int(c * 255) for c in spec.accent)
+    image = Image.new("RGB", (PAGE_WIDTH * PNG_SCALE, PAGE_HEIGHT * PNG_SCALE), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([28 * PNG_SCALE, 28 * PNG_SCALE, 814 * PNG_SCALE, 567 * PNG_SCALE], outline=accent, width=10 * PNG_SCALE)
+    draw.rectangle([44 * PNG_SCALE, 44 * PNG_SCALE, 798 * PNG_SCALE, 551 * PNG_SCALE], outline=accent, width=2 * PNG_SCALE)
+    texts = dict(STATIC_TEXT, title=spec.title)
+    for name, size, y in LINES:
+        if name in texts:
+            _draw_centered(draw, texts[name], size, y, accent if name == "title" else "black")
+    return image
+
+
+def _draw_centered(draw, text: str, size: int, y: int, fill) -> None:
+    # PDF baselines count from the bottom, image rows from the top
+    draw.text(
+        (PAGE_WIDTH * PNG_SCALE // 2, (PAGE_HEIGHT - y) * PNG_SCALE),
+        text,
+        font=_png_font(size),
+        fill=fill,
+        anchor="ms",
+    )
+
+
+def render_png(template_type: str, fields: Dict[str, str]) -> bytes:
+    from PIL import ImageDraw
+
+    image = _png_template(template_type).copy()
+    draw = ImageDraw.Draw(image)
+    for name, size, y in LINES:
+        if name in ("recipient", "meta", "issued"):
+            _draw_centered(draw, fields.get(name) or "", size, y, "black")
+    out = io.BytesIO()
+    image.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def png_supported() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def render(fmt: str, template_type: str, fields: Dict[str, str]) -> bytes:
+    """Entry point executed in the rendering pool."""
+    if template_type not in TEMPLATES:
+        raise ValueError(f"unknown certificate template {template_type}")
+    if fmt == PNG:
+        return render_png(template_type, fields)
+    return render_pdf(template_type, fields)
@@ -1,4 +1,6 @@
 from functools import lru_cache
+from typing import Optional
+
 from pydantic import AnyUrl
 from pydantic_settings import BaseSettings
 
@@ -6,11 +8,64 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     ENVIRONMENT: str = "production"
     DATABASE_URL: AnyUrl
+    ASYNC_DATABASE_URL: Optional[AnyUrl] = None
+    DATABASE_REPLICA_URL: Optional[AnyUrl] = None
+    # After a write, the same client reads from the primary for this long
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_POOL_PRE_PING: bool = True
+
+    # check: compare the stored schema fingerprint and only run create_all on change
+    # create_all: always run create_all (reflects every table)
+    # skip: trust that migrations were applied out of band
+    SCHEMA_STARTUP_MODE: str = "check"
+
+    # Fail requests that exceed their @query_budget (enable in tests)
+    QUERY_BUDGET_ENFORCED: bool = False
+
+    QUIZ_ANSWER_KEY_CACHE_SIZE: int = 1000
+    QUIZ_ANSWER_KEY_TTL_SECONDS: int = 300
+
+    # Run an outbox worker thread in every app process; disable when running
+    # `python -m app.outbox.worker` separately
+    OUTBOX_WORKER_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_SECONDS: float = 2.0
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_RETRY_BASE_SECONDS: int = 5
+
+    # Per-process cache of resource versions behind ETags; bounds how long
+    # another process's write can go unnoticed by a conditional GET
+    RESOURCE_VERSION_CACHE_SIZE: int = 10000
+    RESOURCE_VERSION_TTL_SECONDS: int = 5
+
+    # Rendered certificates, keyed by a hash of their content
+    CERTIFICATE_CACHE_DIR: str = "var/certificates"
+    CERTIFICATE_RENDER_WORKERS: int = 2
+
+    # Background report jobs; results are kept on disk for the retention period
+    REPORT_JOB_DIR: str = "var/report-jobs"
+    REPORT_JOB_WORKERS: int = 2
+    REPORT_JOB_MAX_PENDING: int = 20
+    REPORT_JOB_RETENTION_HOURS: int = 24
+    # Queued/running jobs older than this are reported as abandoned
+    REPORT_JOB_TIMEOUT_SECONDS: int = 3600
 
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_REVOCATION_REFRESH_SECONDS: int = 30
+
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,8 +1,47 @@
 # app/core/db_init.py
+import hashlib
+from datetime import datetime
+from typing import List, Optional, Set
 
+from sqlalchemy import Column, DateTime, Integer, String, Table, UniqueConstraint, delete, insert, inspect, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.core.config import get_settings
 from app.db.session import engine
 from app.db.base import Base
 
+settings = get_settings()
+
+# Arbitrary constant identifying the schema lock among Postgres advisory locks
+SCHEMA_LOCK_KEY = 724_310_001
+
+class SchemaDriftError(RuntimeError):
+    """Existing tables differ from the models in a way create_all cannot fix."""
+
+
+schema_versions = Table(
+    "schema_versions",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def import_models() -> None:
+    """Register every model on Base.metadata, independently of router imports."""
+    import app.users_org.models  # noqa: F401
+    import app.trainings.models  # noqa: F401
+    import app.enrollments_attendance.models  # noqa: F401
+    import app.profiles.models  # noqa: F401
+    import app.gamification.models  # noqa: F401
+    import app.gamification.badges_models  # noqa: F401
+    import app.certificates.models  # noqa: F401
+    import app.outbox.models  # noqa: F401
+    import app.reporting.models  # noqa: F401
+    import app.db.versions  # noqa: F401
+
 
 def create_tables() -> None:
     """
@@ -10,4 +49,121 @@ def create_tables() -> None:
     Safe to call on application startup for an MVP.
     Existing tables are left unchanged.
     """
-    Base.metadata.create_all(bind=engine)
+    import_models()
+    with engine.begin() as conn:
+        _create_missing_tables(conn)
+
+
+def schema_drift(conn) -> List[str]:
+    """
+    Differences between the existing tables and the models that create_all
+    would not repair: missing columns, named unique constraints and indexes.
+    Tables that do not exist yet are not drift.
+    """
+    import_models()
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    problems = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                problems.append(f"{table.name}: missing column {column.name}")
+        named = {c["name"] for c in inspector.get_unique_constraints(table.name)}
+        named |= {i["name"] for i in inspector.get_indexes(table.name)}
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.name and constraint.name not in named:
+                problems.append(f"{table.name}: missing unique constraint {constraint.name}")
+        for index in table.indexes:
+            if index.name and index.name not in named:
+                problems.append(f"{table.name}: missing index {index.name}")
+    return problems
+
+
+def _create_missing_tables(conn) -> Set[str]:
+    """
+    Create the tables that do not exist yet and return their names. Fails
+    when existing tables have drifted, since create_all cannot alter them.
+    """
+    problems = schema_drift(conn)
+    if problems:
+        raise SchemaDriftError(
+            "The database schema does not match the models; apply the scripts in migrations/ first:\n  "
+            + "\n  ".join(problems)
+        )
+    existing = set(inspect(conn).get_table_names())
+    Base.metadata.create_all(bind=conn)
+    created = {table.name for table in Base.metadata.sorted_tables if table.name not in existing}
+    _populate_derived_tables(conn, created)
+    return created
+
+
+def _populate_derived_tables(conn, created: Set[str]) -> None:
+    """Fill newly created tables that are derived from existing data."""
+    from sqlalchemy.orm import Session
+
+    with Session(bind=conn) as db:
+        if "manager_closure" in created:
+            from app.users_org.hierarchy import rebuild_closure
+
+            rebuild_closure(db)
+        if "department_compliance_rollups" in created:
+            from app.reporting.rollups import rebuild_rollups
+
+            rebuild_rollups(db)
+
+
+def schema_fingerprint() -> str:
+    """Hash of the DDL the current models would emit."""
+    import_models()
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode("utf-8"))
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=engine.dialect)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _stored_fingerprint(conn) -> Optional[str]:
+    try:
+        with conn.begin_nested():
+            return conn.execute(
+                select(schema_versions.c.fingerprint).where(schema_versions.c.id == 1)
+            ).scalar()
+    except DBAPIError:
+        # schema_versions does not exist yet
+        return None
+
+
+def prepare_schema(mode: Optional[str] = None) -> None:
+    """
+    Make sure the schema matches the models at worker startup. In "check" mode
+    this is a single-row lookup; when the fingerprint changed, missing tables
+    are created (serialized across workers by an advisory lock) and startup
+    fails with SchemaDriftError if existing tables no longer match the models.
+    """
+    mode = mode or settings.SCHEMA_STARTUP_MODE
+    if mode == "skip":
+        return
+    if mode == "create_all":
+        create_tables()
+        return
+
+    fingerprint = schema_fingerprint()
+    with engine.connect() as conn:
+        if _stored_fingerprint(conn) == fingerprint:
+            return
+
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        # another worker may have migrated while we waited for the lock
+        if _stored_fingerprint(conn) == fingerprint:
+            return
+        _create_missing_tables(conn)
+        conn.execute(delete(schema_versions))
+        conn.execute(
+            insert(schema_versions).values(id=1, fingerprint=fingerprint, applied_at=datetime.utcnow())
+        )
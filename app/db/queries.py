@@ -0,0 +1,95 @@
+# app/db/queries.py
+"""
+Prebuilt statements for the single-row lookups that run on nearly every
+request. They are constructed once at import instead of on every call, and
+since their structure never changes each execution is served from the
+engine's compiled-SQL cache. Async callers execute the same constants.
+"""
+import threading
+from typing import Optional
+
+from sqlalchemy import bindparam, event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.orm import Session
+
+from app.users_org.models import User
+from app.trainings.models import Training
+from app.enrollments_attendance.models import Enrollment
+from app.profiles.models import LearningProfile
+
+USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+TRAINING_BY_ID = select(Training).where(Training.id == bindparam("training_id"))
+ENROLLMENT_BY_ID_FOR_USER = select(Enrollment).where(
+    Enrollment.id == bindparam("enrollment_id"),
+    Enrollment.user_id == bindparam("user_id"),
+)
+ENROLLMENT_BY_TRAINING_AND_USER = select(Enrollment).where(
+    Enrollment.training_id == bindparam("training_id"),
+    Enrollment.user_id == bindparam("user_id"),
+)
+PROFILE_BY_USER_ID = select(LearningProfile).where(LearningProfile.user_id == bindparam("user_id"))
+
+
+def user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.scalars(USER_BY_EMAIL, {"email": email}).first()
+
+
+def user_by_id(db: Session, user_id: int) -> Optional[User]:
+    return db.scalars(USER_BY_ID, {"user_id": user_id}).first()
+
+
+def training_by_id(db: Session, training_id: int) -> Optional[Training]:
+    return db.scalars(TRAINING_BY_ID, {"training_id": training_id}).first()
+
+
+def enrollment_for_user(db: Session, enrollment_id: int, user_id: int) -> Optional[Enrollment]:
+    return db.scalars(ENROLLMENT_BY_ID_FOR_USER, {"enrollment_id": enrollment_id, "user_id": user_id}).first()
+
+
+def enrollment_by_training_and_user(db: Session, training_id: int, user_id: int) -> Optional[Enrollment]:
+    return db.scalars(
+        ENROLLMENT_BY_TRAINING_AND_USER, {"training_id": training_id, "user_id": user_id}
+    ).first()
+
+
+def profile_by_user_id(db: Session, user_id: int) -> Optional[LearningProfile]:
+    return db.scalars(PROFILE_BY_USER_ID, {"user_id": user_id}).first()
+
+
+class CompiledCacheStats:
+    """Counts compiled-cache hits and misses across all engines in this process."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self._lock = threading.Lock()
+
+    def record(self, cache_hit) -> None:
+        with self._lock:
+            if cache_hit is CACHE_HIT:
+                self.hits += 1
+            elif cache_hit is CACHE_MISS:
+                self.misses += 1
+            else:
+                self.uncached += 1
+
+    def stats(self) -> dict:
+        cached = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "hit_ratio": round(self.hits / cached, 4) if cached else 0.0,
+        }
+
+
+compiled_cache_stats = CompiledCacheStats()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_cache_hit(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        compiled_cache_stats.record(getattr(context, "cache_hit", None))
@@ -0,0 +1,89 @@
+# app/db/query_counter.py
+import functools
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements: List[str] = []
+
+
+class QueryBudgetExceeded(AssertionError):
+    """An endpoint ran more statements than its budget (likely an N+1 query)."""
+
+
+_current_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.count += 1
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Count the SQL statements executed inside the block (sync or async)."""
+    counter = QueryCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+def _check(name: str, counter: QueryCounter, max_queries: int) -> None:
+    if counter.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{name} ran {counter.count} queries (budget {max_queries}):\n"
+            + "\n".join(counter.statements)
+        )
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Endpoint decorator that fails the request when the endpoint body runs more
+    than ``max_queries`` statements. A constant budget that holds for small
+    fixtures breaks as soon as the query count grows with the result size.
+    Only active with QUERY_BUDGET_ENFORCED (tests); otherwise a no-op.
+    Place it below the @router decorator.
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        if not settings.QUERY_BUDGET_ENFORCED:
+            return endpoint
+
+        if inspect.iscoroutinefunction(endpoint):
+
+            @functools.wraps(endpoint)
+            async def async_wrapper(*args, **kwargs):
+                with count_queries() as counter:
+                    result = await endpoint(*args, **kwargs)
+                _check(endpoint.__name__, counter, max_queries)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            with count_queries() as counter:
+                result = endpoint(*args, **kwargs)
+            _check(endpoint.__name__, counter, max_queries)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,13 +1,103 @@
-from sqlalchemy import create_engine
+import threading
+from typing import Callable, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import get_settings
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 
 settings = get_settings()
 
+
+def _pool_options() -> dict:
+    # Per process: with N gunicorn workers Postgres sees up to
+    # N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections per engine.
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _async_url(url: str) -> str:
+    """Point a sync Postgres URL at the asyncpg driver."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
 engine = create_engine(
     str(settings.DATABASE_URL),
-    pool_pre_ping=True,
+    poolclass=InstrumentedQueuePool,
+    **_pool_options(),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+# Optional read replica for read-only endpoints; falls back to the primary
+if settings.DATABASE_REPLICA_URL is not None:
+    replica_engine = create_engine(
+        str(settings.DATABASE_REPLICA_URL),
+        poolclass=InstrumentedQueuePool,
+        **_pool_options(),
+    )
+else:
+    replica_engine = engine
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+
+# The async engines run alongside the sync ones so routers can move to async
+# one by one. They are created on first use: importing the app must not
+# require an async driver (sqlite in tests, sync-only tools and CLIs).
+_async_engines: Dict[str, AsyncEngine] = {}
+_async_engines_lock = threading.Lock()
+
+
+def _get_async_engine(name: str, url: str) -> AsyncEngine:
+    with _async_engines_lock:
+        if name not in _async_engines:
+            _async_engines[name] = create_async_engine(
+                url,
+                poolclass=InstrumentedAsyncQueuePool,
+                **_pool_options(),
+            )
+        return _async_engines[name]
+
+
+def get_async_engine() -> AsyncEngine:
+    url = settings.ASYNC_DATABASE_URL or _async_url(str(settings.DATABASE_URL))
+    return _get_async_engine("primary", str(url))
+
+
+def get_async_replica_engine() -> AsyncEngine:
+    if settings.DATABASE_REPLICA_URL is None:
+        return get_async_engine()
+    return _get_async_engine("replica", _async_url(str(settings.DATABASE_REPLICA_URL)))
+
+
+def created_async_engines() -> Dict[str, AsyncEngine]:
+    """The async engines created so far in this process, by role."""
+    with _async_engines_lock:
+        return dict(_async_engines)
+
+
+# Unbound; the request dependencies bind them to the lazily created engines
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+AsyncReadSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+def after_commit(db, callback: Callable[[], None]) -> None:
+    """
+    Run ``callback`` once the session's current transaction commits; it is
+    skipped if the unit of work rolls back. Accepts sync or async sessions.
+    """
+    sync_session = getattr(db, "sync_session", db)
+    event.listen(sync_session, "after_commit", lambda session: callback(), once=True)
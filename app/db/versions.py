@@ -0,0 +1,95 @@
+# app/db/versions.py
+"""
+Version counters for cacheable resources, e.g. "trainings" or
+"profile:user:42". Writers bump the keys they affect inside their own
+transaction; readers turn the current version into an ETag. Versions are
+cached per process for a few seconds, so a conditional GET is usually
+answered without a query. The local entry is dropped when a bump commits;
+other processes see it once their entry expires.
+"""
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import BigInteger, Column, DateTime, String, Table, bindparam, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.db.base import Base
+from app.db.session import after_commit
+
+settings = get_settings()
+
+resource_versions = Table(
+    "resource_versions",
+    Base.metadata,
+    Column("key", String, primary_key=True),
+    Column("version", BigInteger, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+VERSION_BY_KEY = select(resource_versions.c.version).where(resource_versions.c.key == bindparam("key"))
+
+
+def trainings_key() -> str:
+    return "trainings"
+
+
+def quizzes_key(training_id: int) -> str:
+    return f"quizzes:training:{training_id}"
+
+
+def certificates_key(user_id: int) -> str:
+    return f"certificates:user:{user_id}"
+
+
+def profile_key(user_id: int) -> str:
+    return f"profile:user:{user_id}"
+
+
+class ResourceVersions:
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self._cache = TTLCache(maxsize, ttl_seconds)
+
+    def bump(self, db: Session, *keys: str) -> None:
+        """Increment the given keys as part of the caller's transaction."""
+        keys = sorted(set(keys))  # fixed lock order between concurrent writers
+        if not keys:
+            return
+        now = datetime.utcnow()
+        stmt = pg_insert(resource_versions).values(
+            [{"key": key, "version": 1, "updated_at": now} for key in keys]
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[resource_versions.c.key],
+                set_={"version": resource_versions.c.version + 1, "updated_at": now},
+            )
+        )
+        after_commit(db, lambda: self.forget(keys))
+
+    def forget(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._cache.pop(key)
+
+    def get(self, db: Session, key: str) -> int:
+        version = self._cache.get(key)
+        if version is None:
+            version = db.scalar(VERSION_BY_KEY, {"key": key}) or 0
+            self._cache.set(key, version)
+        return version
+
+    async def get_async(self, db: AsyncSession, key: str) -> int:
+        version = self._cache.get(key)
+        if version is None:
+            version = (await db.scalar(VERSION_BY_KEY, {"key": key})) or 0
+            self._cache.set(key, version)
+        return version
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+versions = ResourceVersions(settings.RESOURCE_VERSION_CACHE_SIZE, settings.RESOURCE_VERSION_TTL_SECONDS)
@@ -1,19 +1,20 @@
 # app/enrollments_attendance/router.py
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
-from app.auth.deps import get_current_user, get_db, require_roles
-from app.users_org.models import User, UserRole
-from app.trainings.models import Training
+from app.api.routing import UnitOfWorkRoute
+from app.api.pagination import PageParams, finish_page, paginate
+from app.auth.cache import CachedUser
+from app.auth.deps import get_current_user, get_db, get_read_db, require_roles
+from app.db import queries
+from app.users_org.models import UserRole
 from app.enrollments_attendance import models, schemas
+from app.enrollments_attendance.service import complete_enrollment
+from app.reporting import rollups
 
-from datetime import date
-from app.profiles.models import LearningProfile, TrainingHistoryEntry
-from app.gamification.badges_service import award_badges_if_eligible
-
-router = APIRouter(prefix="/enrollments", tags=["enrollments"])
+router = APIRouter(prefix="/enrollments", tags=["enrollments"], route_class=UnitOfWorkRoute)
 
 
 @router.post(
@@ -25,23 +26,16 @@ router = APIRouter(prefix="/enrollments", tags=["enrollments"])
 def create_enrollment(
     enrollment_in: schemas.EnrollmentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
 ):
-    training = db.query(Training).filter(Training.id == enrollment_in.training_id).first()
+    training = queries.training_by_id(db, enrollment_in.training_id)
     if not training:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Training not found",
         )
 
-    existing = (
-        db.query(models.Enrollment)
-        .filter(
-            models.Enrollment.training_id == enrollment_in.training_id,
-            models.Enrollment.user_id == current_user.id,
-        )
-        .first()
-    )
+    existing = queries.enrollment_by_training_and_user(db, enrollment_in.training_id, current_user.id)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -54,7 +48,8 @@ def create_enrollment(
     )
 
     db.add(enrollment)
-    db.commit()
+    db.flush()
+    rollups.enrollment_created(db, current_user.id, enrollment_in.training_id)
     db.refresh(enrollment)
     return enrollment
 
@@ -65,14 +60,20 @@ def create_enrollment(
     dependencies=[Depends(get_current_user)],
 )
 def list_my_enrollments(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    enrollment_status: Optional[models.EnrollmentStatus] = Query(None, alias="status"),
+    training_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+    current_user: CachedUser = Depends(get_current_user),
 ):
-    return (
-        db.query(models.Enrollment)
-        .filter(models.Enrollment.user_id == current_user.id)
-        .all()
-    )
+    query = db.query(models.Enrollment).filter(models.Enrollment.user_id == current_user.id)
+    if enrollment_status is not None:
+        query = query.filter(models.Enrollment.status == enrollment_status)
+    if training_id is not None:
+        query = query.filter(models.Enrollment.training_id == training_id)
+
+    return finish_page(paginate(query, models.Enrollment.id, page).all(), page, response)
 
 
 @router.post(
@@ -83,62 +84,17 @@ def list_my_enrollments(
 def mark_enrollment_completed(
     enrollment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
 ):
-    enrollment = (
-        db.query(models.Enrollment)
-        .filter(
-            models.Enrollment.id == enrollment_id,
-            models.Enrollment.user_id == current_user.id,
-        )
-        .first()
-    )
-    if not enrollment:
+    result = complete_enrollment(db, enrollment_id, current_user.id)
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Enrollment not found",
         )
 
-    training = db.query(Training).filter(Training.id == enrollment.training_id).first()
-    if not training:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Training not found",
-        )
-
-    enrollment.status = models.EnrollmentStatus.COMPLETED
-    db.commit()
-    db.refresh(enrollment)
-
-    today = date.today()
-    history_entry = TrainingHistoryEntry(
-        user_id=current_user.id,
-        training_id=training.id,
-        status="COMPLETED",
-        completion_date=today,
-        hours_credited=training.duration_hours,
-    )
-    db.add(history_entry)
-
-    profile = (
-        db.query(LearningProfile)
-        .filter(LearningProfile.user_id == current_user.id)
-        .first()
-    )
-    if not profile:
-        profile = LearningProfile(user_id=current_user.id)
-        db.add(profile)
-        db.flush()
-
-    profile.total_learning_hours_current_year += training.duration_hours
-
-    db.commit()
-
-    # Award badges & certificates if thresholds reached
-    award_badges_if_eligible(db, current_user.id, profile.total_learning_hours_current_year)
-
-    return enrollment
-
+    # Completing an already completed enrollment is a no-op
+    return result.enrollment
 
 
 @router.post(
@@ -150,7 +106,6 @@ def mark_enrollment_completed(
 def create_attendance_record(
     record_in: schemas.AttendanceRecordCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
     enrollment = (
         db.query(models.Enrollment)
@@ -170,6 +125,6 @@ def create_attendance_record(
     )
 
     db.add(record)
-    db.commit()
+    db.flush()
     db.refresh(record)
     return record
@@ -0,0 +1,126 @@
+# app/enrollments_attendance/service.py
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import exists, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db import queries
+from app.db.versions import profile_key, versions
+from app.enrollments_attendance.models import Enrollment, EnrollmentStatus
+from app.gamification.badges_service import award_badges_if_eligible
+from app.outbox.events import enqueue, handler
+from app.profiles.models import LearningProfile, TrainingHistoryEntry
+from app.reporting import rollups
+from app.trainings.models import Training
+
+ENROLLMENT_COMPLETED = "enrollment.completed"
+
+
+@dataclass
+class CompletionResult:
+    enrollment: Enrollment
+    # False when the enrollment was already completed and nothing was written
+    completed_now: bool
+    hours_credited: int = 0
+    total_learning_hours: Optional[int] = None
+
+
+def complete_enrollment(db: Session, enrollment_id: int, user_id: int) -> Optional[CompletionResult]:
+    """
+    Mark an enrollment completed and credit its hours within the caller's
+    transaction. The status change is a conditional UPDATE, so of two
+    concurrent completions only one credits hours; the hours counter is
+    incremented in SQL. The remaining side effects are queued in the outbox.
+    Returns None if the user has no such enrollment.
+    """
+    now = datetime.utcnow()
+    row = db.execute(
+        update(Enrollment)
+        .where(
+            Enrollment.id == enrollment_id,
+            Enrollment.user_id == user_id,
+            Enrollment.status != EnrollmentStatus.COMPLETED,
+            Training.id == Enrollment.training_id,
+        )
+        .values(status=EnrollmentStatus.COMPLETED, updated_at=now)
+        .returning(Enrollment, Training.duration_hours)
+        .execution_options(synchronize_session="fetch")
+    ).first()
+
+    if row is None:
+        enrollment = queries.enrollment_for_user(db, enrollment_id, user_id)
+        if enrollment is None:
+            return None
+        return CompletionResult(enrollment=enrollment, completed_now=False)
+
+    enrollment, hours = row
+
+    upsert = pg_insert(LearningProfile).values(
+        user_id=user_id,
+        total_learning_hours_current_year=hours,
+        created_at=now,
+        updated_at=now,
+    )
+    total_hours = db.scalar(
+        upsert.on_conflict_do_update(
+            index_elements=[LearningProfile.user_id],
+            set_={
+                "total_learning_hours_current_year": LearningProfile.total_learning_hours_current_year
+                + upsert.excluded.total_learning_hours_current_year,
+                "updated_at": now,
+            },
+        ).returning(LearningProfile.total_learning_hours_current_year)
+    )
+
+    versions.bump(db, profile_key(user_id))
+    rollups.enrollment_completed(db, user_id, enrollment.training_id)
+
+    # History, badges and certificates are written by the outbox worker
+    enqueue(
+        db,
+        ENROLLMENT_COMPLETED,
+        {
+            "user_id": user_id,
+            "training_id": enrollment.training_id,
+            "hours_credited": hours,
+            "total_learning_hours": total_hours,
+            "completion_date": date.today().isoformat(),
+        },
+    )
+
+    return CompletionResult(
+        enrollment=enrollment,
+        completed_now=True,
+        hours_credited=hours,
+        total_learning_hours=total_hours,
+    )
+
+
+@handler(ENROLLMENT_COMPLETED)
+def record_completion(db: Session, payload: dict) -> None:
+    # Idempotent: a redelivered event must not add a second history entry
+    user_id, training_id = payload["user_id"], payload["training_id"]
+    already_recorded = exists().where(
+        TrainingHistoryEntry.user_id == user_id,
+        TrainingHistoryEntry.training_id == training_id,
+        TrainingHistoryEntry.status == "COMPLETED",
+    )
+    db.execute(
+        insert(TrainingHistoryEntry).from_select(
+            ["user_id", "training_id", "status", "completion_date", "hours_credited", "created_at"],
+            select(
+                literal(user_id),
+                literal(training_id),
+                literal("COMPLETED"),
+                literal(date.fromisoformat(payload["completion_date"])),
+                literal(payload["hours_credited"]),
+                literal(datetime.utcnow()),
+            ).where(~already_recorded),
+        )
+    )
+    versions.bump(db, profile_key(payload["user_id"]))
+    # Award badges & certificates if thresholds reached; awarding is idempotent
+    award_badges_if_eligible(db, payload["user_id"], payload["total_learning_hours"])
@@ -0,0 +1,142 @@
+# app/exports/router.py
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterator, List
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.api.routing import UnitOfWorkRoute
+from app.auth.deps import require_roles
+from app.db.session import ReadSessionLocal
+from app.users_org.models import User, UserRole
+from app.enrollments_attendance.models import AttendanceRecord, Enrollment
+from app.profiles.models import TrainingHistoryEntry
+
+router = APIRouter(prefix="/exports", tags=["exports"], route_class=UnitOfWorkRoute)
+
+EXPORT_BATCH_SIZE = 2000
+
+
+class ExportDataset(str, enum.Enum):
+    USERS = "users"
+    ENROLLMENTS = "enrollments"
+    ATTENDANCE = "attendance"
+    TRAINING_HISTORY = "training-history"
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+EXPORT_COLUMNS = {
+    ExportDataset.USERS: [
+        User.id,
+        User.email,
+        User.full_name,
+        User.role,
+        User.department_id,
+        User.is_active,
+    ],
+    ExportDataset.ENROLLMENTS: list(Enrollment.__table__.columns),
+    ExportDataset.ATTENDANCE: list(AttendanceRecord.__table__.columns),
+    ExportDataset.TRAINING_HISTORY: list(TrainingHistoryEntry.__table__.columns),
+}
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(header: List[str], rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_plain(v) for v in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _encode_ndjson(names: List[str], rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(names, (_plain(v) for v in row))), separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def _export_chunks(dataset: ExportDataset, fmt: ExportFormat) -> Iterator[str]:
+    """
+    Yield the dataset in encoded chunks, reading it through a server-side
+    cursor so memory stays flat regardless of table size. Uses its own session
+    because the response body outlives request-scoped dependencies.
+    """
+    columns = EXPORT_COLUMNS[dataset]
+    names = [c.key for c in columns]
+    if fmt == ExportFormat.CSV:
+        # send the header before the query runs so the client sees bytes at once
+        yield _encode_csv(names, [])
+
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(
+            select(*columns)
+            .order_by(columns[0])
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for rows in result.partitions():
+            if fmt == ExportFormat.CSV:
+                yield _encode_csv([], rows)
+            else:
+                yield _encode_ndjson(names, rows)
+    finally:
+        db.close()
+
+
+def _gzipped(chunks: Iterator[str]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        # sync flush keeps the stream moving instead of buffering the whole export
+        yield compressor.compress(chunk.encode("utf-8")) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def _encoded(chunks: Iterator[str]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+
+@router.get(
+    "/{dataset}",
+    dependencies=[Depends(require_roles(UserRole.ADMIN, UserRole.SUPER_ADMIN))],
+)
+def export_dataset(
+    dataset: ExportDataset,
+    format: ExportFormat = ExportFormat.CSV,
+    gzip: bool = False,
+):
+    chunks = _export_chunks(dataset, format)
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    filename = f"{dataset.value}.{format.value}"
+
+    if gzip:
+        body = _gzipped(chunks)
+        media_type = "application/gzip"
+        filename += ".gz"
+    else:
+        body = _encoded(chunks)
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,98 @@
+# app/gamification/answer_keys.py
+import threading
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.gamification.models import Option, Question, Quiz
+
+settings = get_settings()
+
+PASS_RATIO = 0.6  # e.g., 60% threshold
+
+
+class AnswerKey:
+    """Correct option ids per question of one quiz, enough to grade without the DB."""
+
+    __slots__ = ("quiz_id", "version", "correct", "max_score")
+
+    def __init__(self, quiz_id: int, version: int, correct: Dict[int, FrozenSet[int]]):
+        self.quiz_id = quiz_id
+        self.version = version
+        self.correct = correct
+        self.max_score = float(len(correct))
+
+    def grade(self, answers: Dict[int, int]) -> Tuple[float, float, bool]:
+        """1 point per answered question whose chosen option is a correct one."""
+        correct = self.correct
+        score = float(
+            sum(1 for question_id, option_id in answers.items() if option_id in correct.get(question_id, ()))
+        )
+        return score, self.max_score, score >= self.max_score * PASS_RATIO
+
+
+class AnswerKeyCache:
+    """
+    Per-quiz answer keys. Each quiz has a version that invalidate() bumps; a key
+    loaded while the quiz was being changed is discarded instead of cached.
+    Entries also expire after a TTL so changes made by other workers show up.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self._keys = TTLCache(maxsize, ttl_seconds)
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, quiz_id: int) -> Optional[AnswerKey]:
+        key = self._keys.get(quiz_id)
+        if key is not None:
+            return key
+
+        version = self._versions.get(quiz_id, 0)
+        rows = db.execute(
+            select(Quiz.id, Question.id, Option.id, Option.is_correct)
+            .outerjoin(Question, Question.quiz_id == Quiz.id)
+            .outerjoin(Option, Option.question_id == Question.id)
+            .where(Quiz.id == quiz_id)
+        ).all()
+        if not rows:
+            return None
+        key = self.build(quiz_id, version, ((q, o, c) for _, q, o, c in rows))
+        self._store(key)
+        return key
+
+    def put(self, quiz_id: int, options: Iterable[Tuple[int, Optional[int], bool]]) -> AnswerKey:
+        """Cache a key from (question_id, option_id, is_correct) data already in hand."""
+        key = self.build(quiz_id, self._versions.get(quiz_id, 0), options)
+        self._store(key)
+        return key
+
+    def invalidate(self, quiz_id: int) -> None:
+        with self._lock:
+            self._versions[quiz_id] = self._versions.get(quiz_id, 0) + 1
+            self._keys.pop(quiz_id)
+
+    def stats(self) -> dict:
+        return self._keys.stats()
+
+    @staticmethod
+    def build(quiz_id: int, version: int, options: Iterable[Tuple[Optional[int], Optional[int], bool]]) -> AnswerKey:
+        correct: Dict[int, set] = {}
+        for question_id, option_id, is_correct in options:
+            if question_id is None:
+                continue
+            bucket = correct.setdefault(question_id, set())
+            if option_id is not None and is_correct:
+                bucket.add(option_id)
+        return AnswerKey(quiz_id, version, {q: frozenset(o) for q, o in correct.items()})
+
+    def _store(self, key: AnswerKey) -> None:
+        with self._lock:
+            if self._versions.get(key.quiz_id, 0) == key.version:
+                self._keys.set(key.quiz_id, key)
+
+
+answer_keys = AnswerKeyCache(settings.QUIZ_ANSWER_KEY_CACHE_SIZE, settings.QUIZ_ANSWER_KEY_TTL_SECONDS)
@@ -1,6 +1,13 @@
 # app/gamification/badges_service.py
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from app.db.versions import certificates_key, versions
 from app.gamification.badges_models import Badge, UserBadge
 from app.certificates.models import Certificate
 
@@ -12,42 +19,85 @@ BADGE_DEFINITIONS = [
 ]
 
 
+@dataclass(frozen=True)
+class CatalogBadge:
+    id: int
+    name: str
+    threshold_hours: int
+
+
+# Sorted by threshold; loaded once per process and never mutated afterwards
+_catalog: Optional[Tuple[CatalogBadge, ...]] = None
+_catalog_lock = threading.Lock()
+
+
 def ensure_badges_seeded(db: Session) -> None:
-    existing = {b.name: b for b in db.query(Badge).all()}
-    changed = False
-    for definition in BADGE_DEFINITIONS:
-        if definition["name"] not in existing:
-            badge = Badge(
-                name=definition["name"],
-                threshold_hours=definition["threshold_hours"],
-            )
-            db.add(badge)
-            changed = True
-    if changed:
-        db.commit()
-
-
-def award_badges_if_eligible(db: Session, user_id: int, total_hours_current_year: int) -> None:
+    db.execute(
+        pg_insert(Badge)
+        .values(BADGE_DEFINITIONS)
+        .on_conflict_do_nothing(index_elements=[Badge.name])
+    )
+
+
+def load_badge_catalog(db: Session) -> Tuple[CatalogBadge, ...]:
+    """Seed the badge definitions and (re)load the process-wide catalog. Run at startup."""
+    global _catalog
     ensure_badges_seeded(db)
+    rows = db.execute(
+        select(Badge.id, Badge.name, Badge.threshold_hours).order_by(Badge.threshold_hours, Badge.id)
+    ).all()
+    catalog = tuple(CatalogBadge(id=r.id, name=r.name, threshold_hours=r.threshold_hours) for r in rows)
+    with _catalog_lock:
+        _catalog = catalog
+    return catalog
+
+
+def get_badge_catalog(db: Session) -> Tuple[CatalogBadge, ...]:
+    catalog = _catalog
+    if catalog is None:
+        # not loaded at startup (CLI, scripts): seed within the caller's transaction
+        catalog = load_badge_catalog(db)
+    return catalog
+
+
+def award_badges_if_eligible(db: Session, user_id: int, total_hours_current_year: int) -> List[int]:
+    """
+    Award every badge whose threshold is reached and that the user does not
+    hold yet, with one certificate per newly awarded badge. The unique
+    (user_id, badge_id) constraint makes concurrent awards idempotent.
+    Returns the ids of the badges awarded by this call.
+    """
+    eligible = []
+    for badge in get_badge_catalog(db):
+        if badge.threshold_hours > total_hours_current_year:
+            break
+        eligible.append(badge)
+    if not eligible:
+        return []
+
+    awarded = set(
+        db.scalars(
+            pg_insert(UserBadge)
+            .values([{"user_id": user_id, "badge_id": badge.id} for badge in eligible])
+            .on_conflict_do_nothing(index_elements=[UserBadge.user_id, UserBadge.badge_id])
+            .returning(UserBadge.badge_id)
+        ).all()
+    )
+    new_badges = [badge for badge in eligible if badge.id in awarded]
+    if not new_badges:
+        return []
 
-    badges = db.query(Badge).all()
-    existing_user_badges = {
-        ub.badge_id: ub
-        for ub in db.query(UserBadge).filter(UserBadge.user_id == user_id).all()
-    }
-
-    for badge in badges:
-        if total_hours_current_year >= badge.threshold_hours and badge.id not in existing_user_badges:
-            user_badge = UserBadge(user_id=user_id, badge_id=badge.id)
-            db.add(user_badge)
-            db.flush()
-
-            cert = Certificate(
-                user_id=user_id,
-                badge_id=badge.id,
-                template_type=badge.name,  # SILVER/GOLD/PLATINUM
-                meta=f"Certificate for {badge.name} badge",
-            )
-            db.add(cert)
-
-    db.commit()
+    db.execute(
+        insert(Certificate),
+        [
+            {
+                "user_id": user_id,
+                "badge_id": badge.id,
+                "template_type": badge.name,  # SILVER/GOLD/PLATINUM
+                "meta": f"Certificate for {badge.name} badge",
+            }
+            for badge in new_badges
+        ],
+    )
+    versions.bump(db, certificates_key(user_id))
+    return [badge.id for badge in new_badges]
@@ -0,0 +1,106 @@
+# app/gamification/quiz_service.py
+from typing import List, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db.session import after_commit
+from app.db.versions import quizzes_key, versions
+from app.gamification import schemas
+from app.gamification.answer_keys import answer_keys
+from app.gamification.models import Option, Question, Quiz
+
+
+def insert_quizzes(db: Session, quizzes_in: Sequence[schemas.QuizCreate]) -> List[schemas.QuizRead]:
+    """
+    Insert quizzes with all their questions and options using one multi-row
+    INSERT ... RETURNING per table, independent of the number of questions.
+    The response is assembled from the input and the returned ids, and the
+    answer keys are cached once the transaction commits.
+    """
+    if not quizzes_in:
+        return []
+
+    quiz_ids = db.scalars(
+        insert(Quiz).returning(Quiz.id, sort_by_parameter_order=True),
+        [
+            {"training_id": q.training_id, "title": q.title, "description": q.description}
+            for q in quizzes_in
+        ],
+    ).all()
+
+    question_rows = [
+        {"quiz_id": quiz_id, "text": question.text}
+        for quiz_id, quiz_in in zip(quiz_ids, quizzes_in)
+        for question in quiz_in.questions
+    ]
+    question_ids = iter(
+        db.scalars(
+            insert(Question).returning(Question.id, sort_by_parameter_order=True),
+            question_rows,
+        ).all()
+        if question_rows
+        else []
+    )
+
+    # question ids in input order, one list per quiz
+    quiz_question_ids = [[next(question_ids) for _ in quiz_in.questions] for quiz_in in quizzes_in]
+
+    option_rows = [
+        {"question_id": question_id, "text": option.text, "is_correct": option.is_correct}
+        for quiz_in, question_id_list in zip(quizzes_in, quiz_question_ids)
+        for question, question_id in zip(quiz_in.questions, question_id_list)
+        for option in question.options
+    ]
+    option_ids = iter(
+        db.scalars(
+            insert(Option).returning(Option.id, sort_by_parameter_order=True),
+            option_rows,
+        ).all()
+        if option_rows
+        else []
+    )
+
+    result: List[schemas.QuizRead] = []
+    for quiz_id, quiz_in, question_id_list in zip(quiz_ids, quizzes_in, quiz_question_ids):
+        result.append(
+            schemas.QuizRead(
+                id=quiz_id,
+                training_id=quiz_in.training_id,
+                title=quiz_in.title,
+                description=quiz_in.description,
+                questions=[
+                    schemas.QuestionRead(
+                        id=question_id,
+                        text=question.text,
+                        options=[
+                            schemas.OptionRead(
+                                id=next(option_ids),
+                                text=option.text,
+                                is_correct=option.is_correct,
+                            )
+                            for option in question.options
+                        ],
+                    )
+                    for question, question_id in zip(quiz_in.questions, question_id_list)
+                ],
+            )
+        )
+
+    versions.bump(db, *(quizzes_key(q.training_id) for q in quizzes_in))
+    after_commit(db, lambda: _cache_answer_keys(result))
+    return result
+
+
+def _cache_answer_keys(quizzes: Sequence[schemas.QuizRead]) -> None:
+    for quiz in quizzes:
+        answer_keys.put(
+            quiz.id,
+            [
+                (question.id, option.id, option.is_correct)
+                for question in quiz.questions
+                for option in question.options
+            ]
+            # questions without options still count towards max_score
+            + [(question.id, None, False) for question in quiz.questions if not question.options],
+        )
@@ -1,15 +1,33 @@
 # app/gamification/router.py
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
-from app.auth.deps import get_current_user, get_db, require_roles
+from typing import List, Union
+
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.api.routing import UnitOfWorkRoute
+from app.api.conditional import not_modified, resource_etag, set_etag
+from app.api.files import etag_matches
+from app.auth.cache import CachedUser
+from app.auth.deps import TokenPrincipal, get_current_user, get_db, get_token_principal, require_roles
+from app.db import queries
+from app.db.query_counter import query_budget
+from app.db.versions import quizzes_key, versions
+from app.users_org import hierarchy
 from app.users_org.models import User, UserRole
 from app.trainings.models import Training
 from app.gamification import models, schemas
+from app.gamification.answer_keys import answer_keys
+from app.gamification.quiz_service import insert_quizzes
+
+router = APIRouter(prefix="/quizzes", tags=["quizzes"], route_class=UnitOfWorkRoute)
 
-router = APIRouter(prefix="/quizzes", tags=["quizzes"])
+# Loads a quiz's questions and their options in two extra queries in total
+QUIZ_GRAPH = selectinload(models.Quiz.questions).selectinload(models.Question.options)
+
+QUIZ_IMPORT_ADAPTER = TypeAdapter(Union[List[schemas.QuizCreate], schemas.QuizCreate])
 
 
 @router.post(
@@ -18,66 +36,47 @@ router = APIRouter(prefix="/quizzes", tags=["quizzes"])
     status_code=status.HTTP_201_CREATED,
     dependencies=[Depends(require_roles(UserRole.ADMIN, UserRole.SUPER_ADMIN))],
 )
+@query_budget(5)
 def create_quiz(
     quiz_in: schemas.QuizCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    training = db.query(Training).filter(Training.id == quiz_in.training_id).first()
+    training = queries.training_by_id(db, quiz_in.training_id)
     if not training:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Training not found",
         )
 
-    quiz = models.Quiz(
-        training_id=quiz_in.training_id,
-        title=quiz_in.title,
-        description=quiz_in.description,
-    )
-    db.add(quiz)
-    db.flush()
+    return insert_quizzes(db, [quiz_in])[0]
 
-    for q in quiz_in.questions:
-        question = models.Question(
-            quiz_id=quiz.id,
-            text=q.text,
+
+@router.post(
+    "/import",
+    response_model=List[schemas.QuizRead],
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_roles(UserRole.ADMIN, UserRole.SUPER_ADMIN))],
+)
+def import_quizzes(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+):
+    """Import one quiz or a list of quizzes from a JSON file in the QuizCreate shape."""
+    try:
+        parsed = QUIZ_IMPORT_ADAPTER.validate_json(file.file.read())
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors(include_url=False))
+    quizzes_in = parsed if isinstance(parsed, list) else [parsed]
+
+    training_ids = {q.training_id for q in quizzes_in}
+    found = set(db.scalars(select(Training.id).where(Training.id.in_(training_ids))).all())
+    if found != training_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Training not found: {sorted(training_ids - found)}",
         )
-        db.add(question)
-        db.flush()
-        for opt in q.options:
-            option = models.Option(
-                question_id=question.id,
-                text=opt.text,
-                is_correct=opt.is_correct,
-            )
-            db.add(option)
-
-    db.commit()
-    db.refresh(quiz)
-
-    # manually load questions/options for response
-    return schemas.QuizRead(
-        id=quiz.id,
-        training_id=quiz.training_id,
-        title=quiz.title,
-        description=quiz.description,
-        questions=[
-            schemas.QuestionRead(
-                id=question.id,
-                text=question.text,
-                options=[
-                    schemas.OptionRead(
-                        id=opt.id,
-                        text=opt.text,
-                        is_correct=opt.is_correct,
-                    )
-                    for opt in question.options
-                ],
-            )
-            for question in quiz.questions
-        ],
-    )
+
+    return insert_quizzes(db, quizzes_in)
 
 
 @router.get(
@@ -85,12 +84,24 @@ def create_quiz(
     response_model=List[schemas.QuizRead],
     dependencies=[Depends(get_current_user)],
 )
+@query_budget(4)
 def list_quizzes_for_training(
     training_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    quizzes = db.query(models.Quiz).filter(models.Quiz.training_id == training_id).all()
+    etag = resource_etag(request, quizzes_key(training_id), versions.get(db, quizzes_key(training_id)))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    quizzes = (
+        db.query(models.Quiz)
+        .options(QUIZ_GRAPH)
+        .filter(models.Quiz.training_id == training_id)
+        .all()
+    )
     result: List[schemas.QuizRead] = []
     for quiz in quizzes:
         result.append(
@@ -125,43 +136,86 @@ def list_quizzes_for_training(
     status_code=status.HTTP_201_CREATED,
     dependencies=[Depends(get_current_user)],
 )
+@query_budget(2)
 def submit_quiz(
     quiz_id: int,
     submission_in: schemas.QuizSubmissionCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
 ):
-    quiz = db.query(models.Quiz).filter(models.Quiz.id == quiz_id).first()
-    if not quiz:
+    answer_key = answer_keys.get(db, quiz_id)
+    if answer_key is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Quiz not found",
         )
 
-    # Compute score: 1 point per question if selected option is the correct one
-    answers = submission_in.answers
-    max_score = float(len(quiz.questions))
-    score = 0.0
-
-    for question in quiz.questions:
-        selected_option_id = answers.get(question.id)
-        if selected_option_id is None:
-            continue
-        option = next((o for o in question.options if o.id == selected_option_id), None)
-        if option and option.is_correct:
-            score += 1.0
-
-    passed = score >= max_score * 0.6  # e.g., 60% threshold
+    score, max_score, passed = answer_key.grade(submission_in.answers)
 
     submission = models.QuizSubmission(
-        quiz_id=quiz.id,
+        quiz_id=quiz_id,
         user_id=current_user.id,
         score=score,
         max_score=max_score,
         passed=passed,
     )
     db.add(submission)
-    db.commit()
-    db.refresh(submission)
+    db.flush()
 
     return submission
+
+
+@router.post(
+    "/{quiz_id}/grade-batch",
+    response_model=List[schemas.QuizSubmissionRead],
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_roles(UserRole.MANAGER, UserRole.ADMIN, UserRole.SUPER_ADMIN))],
+)
+@query_budget(3)
+def grade_batch(
+    quiz_id: int,
+    batch_in: schemas.BatchGradeCreate,
+    db: Session = Depends(get_db),
+    principal: TokenPrincipal = Depends(get_token_principal),
+):
+    """Grade many candidates' answer sheets for one quiz in a single call (proctored exams)."""
+    answer_key = answer_keys.get(db, quiz_id)
+    if answer_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found",
+        )
+    if not batch_in.submissions:
+        return []
+
+    user_ids = {s.user_id for s in batch_in.submissions}
+    # Managers can only grade users below them; one lookup for the whole batch
+    below = User.id.in_(hierarchy.reportee_ids(principal.user_id))
+    found = dict(db.execute(select(User.id, below).where(User.id.in_(user_ids))).all())
+    if set(found) != user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown user ids: {sorted(user_ids - set(found))}",
+        )
+    if principal.role == UserRole.MANAGER:
+        outside = sorted(user_id for user_id, is_below in found.items() if not is_below)
+        if outside:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Not allowed to grade user ids: {outside}",
+            )
+
+    rows = []
+    for sheet in batch_in.submissions:
+        score, max_score, passed = answer_key.grade(sheet.answers)
+        rows.append(
+            {
+                "quiz_id": quiz_id,
+                "user_id": sheet.user_id,
+                "score": score,
+                "max_score": max_score,
+                "passed": passed,
+            }
+        )
+
+    return db.scalars(insert(models.QuizSubmission).returning(models.QuizSubmission), rows).all()
@@ -1,6 +1,9 @@
 # app/gamification/schemas.py
 from typing import List, Dict
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# Largest answer-sheet batch accepted by one grade-batch call
+MAX_BATCH_SUBMISSIONS = 500
 
 
 class OptionBase(BaseModel):
@@ -68,3 +71,13 @@ class QuizSubmissionRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CandidateAnswers(BaseModel):
+    user_id: int
+    # mapping question_id -> chosen option_id
+    answers: Dict[int, int]
+
+
+class BatchGradeCreate(BaseModel):
+    submissions: List[CandidateAnswers] = Field(max_length=MAX_BATCH_SUBMISSIONS)
@@ -1,54 +1,137 @@
+import gc
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api.health import router as health_router
-from app.auth.router import router as auth_router
-from app.users_org.router import router as users_router
-from app.trainings.router import router as trainings_router
-from app.enrollments_attendance.router import router as enrollments_router
-from app.profiles.router import router as profiles_router
-from app.reporting.router import router as reporting_router
-from app.gamification.router import router as gamification_router
-from app.certificates.router import router as certificates_router
-from app.core.db_init import create_tables
+origins = [
+    "http://localhost:3000",
+    "http://localhost:5173",
+    # add frontend URLs here
+]
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: create tables
-    create_tables()
+    from app.auth.hashing import password_hasher
+    from app.certificates.rendering import certificate_renderer
+    from app.core.config import get_settings
+    from app.core.db_init import prepare_schema
+    from app.db.session import SessionLocal, created_async_engines
+    from app.gamification.badges_service import load_badge_catalog
+    from app.outbox.worker import outbox_worker
+    from app.reporting.jobs import report_jobs
+
+    # Startup: verify (or create) the schema, then load the badge catalog
+    prepare_schema()
+    with SessionLocal.begin() as db:
+        load_badge_catalog(db)
+    if get_settings().OUTBOX_WORKER_ENABLED:
+        outbox_worker.start()
     yield
-    # Shutdown: nothing special for now
+    # Shutdown: stop the outbox worker and the worker pools, close async connections
+    outbox_worker.stop()
+    password_hasher.shutdown()
+    certificate_renderer.shutdown()
+    report_jobs.shutdown()
+    for async_engine in created_async_engines().values():
+        await async_engine.dispose()
 
 
-app = FastAPI(
-    title="L&D Portal API",
-    version="0.1.0",
-    lifespan=lifespan,
-)
+def create_app() -> FastAPI:
+    """
+    Build the application. Routers, models and their dependencies are
+    imported here rather than when app.main is imported.
+    """
+    from app.api.health import router as health_router
+    from app.api.pagination import NEXT_CURSOR_HEADER
+    from app.api.admin import router as admin_router
+    from app.auth.router import router as auth_router
+    from app.users_org.router import router as users_router
+    from app.trainings.router import router as trainings_router
+    from app.enrollments_attendance.router import router as enrollments_router
+    from app.profiles.router import router as profiles_router
+    from app.reporting.router import router as reporting_router
+    from app.gamification.router import router as gamification_router
+    from app.certificates.router import router as certificates_router
+    from app.exports.router import router as exports_router
+    from app.auth.hashing import HashingOverloaded
+    from app.auth.deps import READ_PRIMARY_COOKIE
+    from app.core.config import get_settings
+    from app.db.session import engine, replica_engine
+
+    app = FastAPI(
+        title="L&D Portal API",
+        version="0.1.0",
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
+    )
+
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        response = await call_next(request)
+        if (
+            replica_engine is not engine
+            and request.method not in ("GET", "HEAD", "OPTIONS")
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                READ_PRIMARY_COOKIE,
+                "1",
+                max_age=get_settings().READ_YOUR_WRITES_SECONDS,
+                httponly=True,
+                samesite="lax",
+            )
+        return response
+
+    @app.exception_handler(HashingOverloaded)
+    async def hashing_overloaded_handler(request: Request, exc: HashingOverloaded):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Authentication service is busy, please retry"},
+            headers={"Retry-After": "1"},
+        )
+
+    app.include_router(health_router)
+    app.include_router(admin_router)
+    app.include_router(auth_router)
+    app.include_router(users_router)
+    app.include_router(trainings_router)
+    app.include_router(enrollments_router)
+    app.include_router(profiles_router)
+    app.include_router(reporting_router)
+    app.include_router(gamification_router)
+    app.include_router(certificates_router)
+    app.include_router(exports_router)
+
+    return app
+
+
+def create_preloaded_app() -> FastAPI:
+    """
+    Factory for gunicorn --preload. The app is built once in the master, then
+    every object allocated so far is moved to the permanent GC generation so
+    forked workers do not dirty those shared pages on each collection.
+    """
+    app = create_app()
+    gc.collect()
+    gc.freeze()
+    return app
 
-origins = [
-    "http://localhost:3000",
-    "http://localhost:5173",
-    # add frontend URLs here
-]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.include_router(health_router)
-app.include_router(auth_router)
-app.include_router(users_router)
-app.include_router(trainings_router)
-app.include_router(enrollments_router)
-app.include_router(profiles_router)
-app.include_router(reporting_router)
-app.include_router(gamification_router)
-app.include_router(certificates_router)
\ No newline at end of file
+def __getattr__(name: str):
+    # `uvicorn app.main:app` keeps working; the app is built on first access
+    if name == "app":
+        app = create_app()
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,42 @@
+# app/outbox/events.py
+"""
+Transactional outbox. State changes that have follow-up work record an event
+in the same transaction with enqueue(); the worker (app.outbox.worker) later
+runs the handler registered for the event type. Handlers run at least once
+and must be idempotent.
+"""
+from typing import Callable, Dict
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db.session import after_commit
+from app.outbox.models import OutboxEvent
+
+Handler = Callable[[Session, dict], None]
+
+HANDLERS: Dict[str, Handler] = {}
+
+
+def handler(event_type: str) -> Callable[[Handler], Handler]:
+    """Register the function that processes ``event_type`` events."""
+
+    def register(func: Handler) -> Handler:
+        HANDLERS[event_type] = func
+        return func
+
+    return register
+
+
+def import_handlers() -> None:
+    """Import every module that registers outbox handlers."""
+    import app.enrollments_attendance.service  # noqa: F401
+
+
+def enqueue(db: Session, event_type: str, payload: dict) -> None:
+    db.execute(insert(OutboxEvent).values(event_type=event_type, payload=payload))
+
+    from app.outbox.worker import outbox_worker
+
+    # an in-process worker picks the event up right away instead of at its next poll
+    after_commit(db, outbox_worker.wake)
@@ -0,0 +1,143 @@
+# app/outbox/worker.py
+"""
+Drains the outbox in batches. Rows are claimed with FOR UPDATE SKIP LOCKED,
+so any number of workers (one thread per app process and/or standalone
+processes) can run side by side. Each event is handled in a savepoint and
+marked DONE in the same transaction; failures are retried with exponential
+backoff. Standalone usage:
+
+    python -m app.outbox.worker
+"""
+import argparse
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.outbox.events import HANDLERS, import_handlers
+from app.outbox.models import OutboxEvent, OutboxStatus
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 3600
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS))
+
+
+def drain_once(batch_size: Optional[int] = None) -> Tuple[int, int]:
+    """Process one batch of due events; returns how many were claimed and how many succeeded."""
+    from app.db.session import SessionLocal
+
+    import_handlers()
+    now = datetime.utcnow()
+    with SessionLocal.begin() as db:
+        events = db.scalars(
+            select(OutboxEvent)
+            .where(OutboxEvent.status == OutboxStatus.PENDING, OutboxEvent.available_at <= now)
+            .order_by(OutboxEvent.id)
+            .limit(batch_size or settings.OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        ).all()
+
+        succeeded = 0
+        for event in events:
+            event.attempts += 1
+            try:
+                func = HANDLERS[event.event_type]
+                with db.begin_nested():
+                    func(db, event.payload)
+            except Exception as exc:
+                logger.exception("outbox event %s (%s) failed", event.id, event.event_type)
+                event.last_error = f"{type(exc).__name__}: {exc}"
+                if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    event.status = OutboxStatus.FAILED
+                else:
+                    event.available_at = now + _backoff(event.attempts)
+            else:
+                event.status = OutboxStatus.DONE
+                event.processed_at = datetime.utcnow()
+                event.last_error = None
+                succeeded += 1
+        return len(events), succeeded
+
+
+class OutboxWorker:
+    """Background thread that drains the outbox until stopped."""
+
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.processed = 0
+        self.failed = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self.run, name="outbox-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                claimed, succeeded = drain_once()
+                self.processed += succeeded
+                self.failed += claimed - succeeded
+            except Exception:
+                # e.g. the database is unreachable; try again at the next poll
+                logger.exception("outbox drain failed")
+                self.errors += 1
+                claimed = 0
+            if claimed < settings.OUTBOX_BATCH_SIZE:
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+
+    def stats(self) -> dict:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "processed": self.processed,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+outbox_worker = OutboxWorker(settings.OUTBOX_POLL_SECONDS)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Drain the transactional outbox")
+    parser.add_argument("--once", action="store_true", help="process the due events and exit")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.once:
+        while drain_once()[0] == settings.OUTBOX_BATCH_SIZE:
+            pass
+        return
+    try:
+        outbox_worker.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,49 +2,84 @@
 from datetime import date
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.auth.deps import get_current_user, get_db, require_roles
-from app.users_org.models import User, UserRole
+from app.api.routing import UnitOfWorkRoute
+from app.api.conditional import not_modified, resource_etag, set_etag
+from app.api.files import etag_matches
+from app.auth.cache import CachedUser
+from app.auth.deps import (
+    TokenPrincipal,
+    get_async_db,
+    get_current_user,
+    get_current_user_async,
+    get_db,
+    get_token_principal,
+    require_roles,
+)
+from app.db import queries
+from app.db.query_counter import query_budget
+from app.db.versions import profile_key, versions
+from app.users_org import hierarchy
+from app.users_org.models import UserRole
 from app.enrollments_attendance.models import Enrollment, EnrollmentStatus
 from app.trainings.models import Training
 from app.profiles import models, schemas
 
-router = APIRouter(prefix="/profiles", tags=["profiles"])
+router = APIRouter(prefix="/profiles", tags=["profiles"], route_class=UnitOfWorkRoute)
 
 
 def _get_or_create_profile(db: Session, user_id: int) -> models.LearningProfile:
-    profile = (
-        db.query(models.LearningProfile)
-        .filter(models.LearningProfile.user_id == user_id)
-        .first()
-    )
+    profile = queries.profile_by_user_id(db, user_id)
     if not profile:
         profile = models.LearningProfile(user_id=user_id)
         db.add(profile)
-        db.commit()
+        db.flush()
         db.refresh(profile)
     return profile
 
 
+async def _get_profile_async(db: AsyncSession, user_id: int) -> models.LearningProfile:
+    """
+    The stored profile, or an unsaved empty one: reads never insert, the
+    profile row is created by the first write (profile update, completion).
+    """
+    result = await db.scalars(queries.PROFILE_BY_USER_ID, {"user_id": user_id})
+    profile = result.first()
+    if not profile:
+        profile = models.LearningProfile(user_id=user_id, total_learning_hours_current_year=0)
+    return profile
+
+
 @router.get("/me", response_model=schemas.LearningProfileRead)
-def get_my_profile(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@query_budget(4)
+async def get_my_profile(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_user_async),
 ):
-    profile = _get_or_create_profile(db, current_user.id)
+    key = profile_key(current_user.id)
+    etag = resource_etag(request, key, await versions.get_async(db, key))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    profile = await _get_profile_async(db, current_user.id)
 
     certs = (
-        db.query(models.Certification)
-        .filter(models.Certification.user_id == current_user.id)
-        .all()
-    )
+        await db.scalars(
+            select(models.Certification).where(models.Certification.user_id == current_user.id)
+        )
+    ).all()
     history = (
-        db.query(models.TrainingHistoryEntry)
-        .filter(models.TrainingHistoryEntry.user_id == current_user.id)
-        .all()
-    )
+        await db.scalars(
+            select(models.TrainingHistoryEntry).where(models.TrainingHistoryEntry.user_id == current_user.id)
+        )
+    ).all()
 
     # Manual assembly into Pydantic schema
     return schemas.LearningProfileRead(
@@ -60,14 +95,15 @@ def get_my_profile(
 def update_my_profile(
     update_in: schemas.LearningProfileUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
 ):
     profile = _get_or_create_profile(db, current_user.id)
 
     if update_in.tech_stack is not None:
         profile.tech_stack = update_in.tech_stack
+        versions.bump(db, profile_key(current_user.id))
 
-    db.commit()
+    db.flush()
     db.refresh(profile)
 
     certs = (
@@ -98,7 +134,7 @@ def update_my_profile(
 def add_my_certification(
     cert_in: schemas.CertificationCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
 ):
     cert = models.Certification(
         user_id=current_user.id,
@@ -109,7 +145,8 @@ def add_my_certification(
         linked_training_id=cert_in.linked_training_id,
     )
     db.add(cert)
-    db.commit()
+    db.flush()
+    versions.bump(db, profile_key(current_user.id))
     db.refresh(cert)
     return cert
 
@@ -121,20 +158,11 @@ def add_my_certification(
 def get_user_profile_for_manager(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    principal: TokenPrincipal = Depends(get_token_principal),
 ):
-    # Managers can only see their reportees; Admin/Super Admin can see anyone
-    if current_user.role == UserRole.MANAGER:
-        from app.users_org.models import ManagerRelationship
-        rel = (
-            db.query(ManagerRelationship)
-            .filter(
-                ManagerRelationship.manager_id == current_user.id,
-                ManagerRelationship.reportee_id == user_id,
-            )
-            .first()
-        )
-        if not rel:
+    # Managers can only see users below them; Admin/Super Admin can see anyone
+    if principal.role == UserRole.MANAGER:
+        if not hierarchy.is_under(db, principal.user_id, user_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not allowed to view this user's profile",
@@ -0,0 +1,372 @@
+# app/reporting/jobs.py
+"""
+Background report jobs. A job computes one report on a bounded thread pool
+and writes the result to REPORT_JOB_DIR as CSV or JSON, next to a small JSON
+metadata file, so any worker process can answer status and download
+requests. Identical requests attach to the job already queued or running
+(tracked with an exclusive marker file per request key that records the
+owning job, pid and host, so a marker left by a dead process on this host
+is replaced at once). Finished jobs are deleted after
+REPORT_JOB_RETENTION_HOURS.
+"""
+import csv
+import enum
+import hashlib
+import io
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.core.files import write_atomically
+from app.reporting import service
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL_SECONDS = 600
+
+
+class ReportKind(str, enum.Enum):
+    DEPARTMENT_MANDATORY_COMPLETION = "departments-mandatory-completion"
+    MANAGER_MANDATORY_COMPLETION = "managers-mandatory-completion"
+
+
+class ResultFormat(str, enum.Enum):
+    CSV = "csv"
+    JSON = "json"
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+ACTIVE = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+MEDIA_TYPES = {ResultFormat.CSV: "text/csv", ResultFormat.JSON: "application/json"}
+
+REPORTS: Dict[ReportKind, Callable[..., List[dict]]] = {
+    ReportKind.DEPARTMENT_MANDATORY_COMPLETION: service.department_mandatory_completion,
+    ReportKind.MANAGER_MANDATORY_COMPLETION: service.manager_mandatory_completion,
+}
+
+
+class JobQueueFull(Exception):
+    """Raised when REPORT_JOB_MAX_PENDING jobs are already queued or running."""
+
+
+@dataclass
+class ReportJob:
+    id: str
+    kind: ReportKind
+    format: ResultFormat
+    params: dict
+    key: str
+    requested_by: int
+    status: JobStatus = JobStatus.QUEUED
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    rows: Optional[int] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+
+    def to_json(self) -> bytes:
+        data = asdict(self)
+        for name in ("created_at", "started_at", "finished_at"):
+            if data[name] is not None:
+                data[name] = data[name].isoformat()
+        for name in ("kind", "format", "status"):
+            data[name] = data[name].value
+        return json.dumps(data).encode("utf-8")
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> "ReportJob":
+        data = json.loads(raw)
+        for name in ("created_at", "started_at", "finished_at"):
+            if data[name] is not None:
+                data[name] = datetime.fromisoformat(data[name])
+        data["kind"] = ReportKind(data["kind"])
+        data["format"] = ResultFormat(data["format"])
+        data["status"] = JobStatus(data["status"])
+        return cls(**data)
+
+
+def request_key(kind: ReportKind, fmt: ResultFormat, params: dict) -> str:
+    raw = json.dumps({"kind": kind.value, "format": fmt.value, "params": params}, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _encode(rows: List[dict], fmt: ResultFormat) -> bytes:
+    if fmt == ResultFormat.JSON:
+        return json.dumps(rows, default=str).encode("utf-8")
+    buffer = io.StringIO()
+    if rows:
+        writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+class ReportJobRunner:
+    def __init__(self, job_dir: str, max_workers: int, max_pending: int, retention_hours: int, timeout_seconds: int):
+        self.job_dir = Path(job_dir)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention = timedelta(hours=retention_hours)
+        self.timeout = timedelta(seconds=timeout_seconds)
+        self.completed = 0
+        self.failed = 0
+        self.attached = 0
+        # jobs queued or running in this process
+        self._jobs: Dict[str, ReportJob] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._last_purge = 0.0
+
+    # -- paths -------------------------------------------------------------
+
+    def _meta_path(self, job_id: str) -> Path:
+        return self.job_dir / f"{job_id}.json"
+
+    def result_path(self, job: ReportJob) -> Path:
+        return self.job_dir / f"{job.id}.result.{job.format.value}"
+
+    def _marker_path(self, key: str) -> Path:
+        return self.job_dir / "active" / key
+
+    # -- public API --------------------------------------------------------
+
+    def submit(self, kind: ReportKind, fmt: ResultFormat, params: dict, requested_by: int) -> ReportJob:
+        """Queue a job, or return the queued/running job for an identical request."""
+        self.job_dir.joinpath("active").mkdir(parents=True, exist_ok=True)
+        self._maybe_purge()
+
+        key = request_key(kind, fmt, params)
+        marker = self._marker_path(key)
+        while True:
+            job = ReportJob(
+                id=uuid.uuid4().hex,
+                kind=kind,
+                format=fmt,
+                params=params,
+                key=key,
+                requested_by=requested_by,
+            )
+            try:
+                fd = os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                running = self._running_job(marker)
+                if running is not None:
+                    with self._lock:
+                        self.attached += 1
+                    return running
+                continue
+            with os.fdopen(fd, "w") as f:
+                json.dump({"job_id": job.id, "pid": os.getpid(), "host": socket.gethostname()}, f)
+            break
+
+        with self._lock:
+            if len(self._jobs) >= self.max_pending:
+                marker.unlink(missing_ok=True)
+                raise JobQueueFull()
+            self._jobs[job.id] = job
+
+        self._save(job)
+        self._pool().submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        try:
+            job = ReportJob.from_json(self._meta_path(job_id).read_bytes())
+        except (FileNotFoundError, ValueError):
+            return None
+        if job.status in ACTIVE and datetime.utcnow() - job.created_at > self.timeout:
+            # the process running it went away (restart, crash)
+            job.status = JobStatus.FAILED
+            job.error = "abandoned"
+        return job
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": len(self._jobs),
+            "completed": self.completed,
+            "failed": self.failed,
+            "attached": self.attached,
+        }
+
+    def shutdown(self) -> None:
+        """
+        Stop the pool and fail the jobs this process still owns, releasing
+        their markers so identical requests start a new job right away.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+        for job in jobs:
+            self._fail(job, "interrupted by shutdown")
+            self._release_marker(self._marker_path(job.key), job.id)
+
+    # -- internals ---------------------------------------------------------
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="report-job")
+            return self._executor
+
+    @staticmethod
+    def _read_marker(marker: Path) -> Optional[dict]:
+        try:
+            raw = marker.read_text()
+        except FileNotFoundError:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            # created by another request that has not written it yet
+            return {}
+
+    @staticmethod
+    def _is_fresh(marker: Path) -> bool:
+        try:
+            return time.time() - marker.stat().st_mtime < 5
+        except FileNotFoundError:
+            return False
+
+    def _owner_alive(self, owner: dict) -> bool:
+        if owner.get("host") != socket.gethostname():
+            # processes on other hosts cannot be probed; the job timeout applies
+            return True
+        pid = owner.get("pid")
+        if pid == os.getpid():
+            with self._lock:
+                return owner.get("job_id") in self._jobs
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except (PermissionError, TypeError):
+            pass
+        return True
+
+    def _release_marker(self, marker: Path, job_id: Optional[str]) -> None:
+        """Remove the marker only if it still belongs to ``job_id``."""
+        owner = self._read_marker(marker)
+        if owner is not None and owner.get("job_id") == job_id:
+            marker.unlink(missing_ok=True)
+
+    def _running_job(self, marker: Path) -> Optional[ReportJob]:
+        """
+        The active job owning ``marker``, or None once the marker is gone or
+        was removed because its job finished or its process died.
+        """
+        for _ in range(100):
+            owner = self._read_marker(marker)
+            if owner is None:
+                return None
+            job_id = owner.get("job_id")
+            job = self.get(job_id) if job_id else None
+            if job is None and self._is_fresh(marker):
+                # marker just created by another request, metadata not saved yet
+                time.sleep(0.05)
+                continue
+            if job is not None and job.status in ACTIVE:
+                if self._owner_alive(owner):
+                    return job
+                self._fail(job, "abandoned")
+            self._release_marker(marker, job_id)
+            return None
+        return None
+
+    def _save(self, job: ReportJob) -> None:
+        write_atomically(self._meta_path(job.id), job.to_json())
+
+    def _fail(self, job: ReportJob, error: str) -> None:
+        job.status = JobStatus.FAILED
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        self._save(job)
+
+    def _run(self, job: ReportJob) -> None:
+        from app.db.session import ReadSessionLocal
+
+        with self._lock:
+            # shutdown() may already have failed this job
+            if job.id not in self._jobs:
+                return
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.utcnow()
+            self._save(job)
+        try:
+            with ReadSessionLocal() as db:
+                rows = REPORTS[job.kind](db, **job.params)
+            data = _encode(rows, job.format)
+            write_atomically(self.result_path(job), data)
+            job.rows = len(rows)
+            job.size = len(data)
+            job.status = JobStatus.SUCCEEDED
+            with self._lock:
+                self.completed += 1
+        except Exception as exc:
+            logger.exception("report job %s failed", job.id)
+            job.status = JobStatus.FAILED
+            job.error = f"{type(exc).__name__}: {exc}"
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                owned = self._jobs.pop(job.id, None) is not None
+            if owned:
+                job.finished_at = datetime.utcnow()
+                self._save(job)
+                self._release_marker(self._marker_path(job.key), job.id)
+
+    def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_purge < PURGE_INTERVAL_SECONDS:
+                return
+            self._last_purge = now
+        self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Delete jobs (metadata and result) that finished longer ago than the retention."""
+        cutoff = datetime.utcnow() - self.retention
+        removed = 0
+        for meta in self.job_dir.glob("*.json"):
+            if ".result." in meta.name:
+                continue
+            job = self.get(meta.stem)
+            if job is None or job.status in ACTIVE or (job.finished_at or job.created_at) > cutoff:
+                continue
+            self.result_path(job).unlink(missing_ok=True)
+            meta.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+report_jobs = ReportJobRunner(
+    job_dir=settings.REPORT_JOB_DIR,
+    max_workers=settings.REPORT_JOB_WORKERS,
+    max_pending=settings.REPORT_JOB_MAX_PENDING,
+    retention_hours=settings.REPORT_JOB_RETENTION_HOURS,
+    timeout_seconds=settings.REPORT_JOB_TIMEOUT_SECONDS,
+)
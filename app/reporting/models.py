@@ -0,0 +1,26 @@
+# app/reporting/models.py
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+
+from app.db.base import Base
+
+
+class DepartmentComplianceRollup(Base):
+    """
+    Per-department counters behind the compliance report, kept up to date in
+    the transactions that change them (see app.reporting.rollups).
+    """
+
+    __tablename__ = "department_compliance_rollups"
+
+    department_id = Column(Integer, ForeignKey("departments.id"), primary_key=True)
+
+    total_employees = Column(Integer, nullable=False, default=0)
+    # enrollments of the department's users in mandatory trainings
+    mandatory_enrollments = Column(Integer, nullable=False, default=0)
+    mandatory_completions = Column(Integer, nullable=False, default=0)
+    # users with at least one completed mandatory enrollment
+    employees_completed_mandatory_any = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,185 @@
+# app/reporting/rollups.py
+"""
+Maintenance of department_compliance_rollups. Simple events apply +1 deltas
+with a single INSERT ... SELECT ... ON CONFLICT DO UPDATE in the caller's
+transaction; changes that move many rows at once (department moves, HRIS
+syncs, is_mandatory toggles) rebuild the affected departments instead.
+The table is filled when it is first created at startup (app.core.db_init).
+A full rebuild reconciles any drift:
+
+    python -m app.reporting.rollups
+"""
+import argparse
+import json
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, case, delete, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.enrollments_attendance.models import Enrollment, EnrollmentStatus
+from app.reporting.models import DepartmentComplianceRollup as Rollup
+from app.trainings.models import Training
+from app.users_org.models import Department, User
+
+COUNTERS = (
+    "total_employees",
+    "mandatory_enrollments",
+    "mandatory_completions",
+    "employees_completed_mandatory_any",
+)
+
+
+def _apply(db: Session, source) -> None:
+    """
+    Add the counter deltas selected by ``source`` (department_id followed by
+    one column per COUNTERS entry) to the rollup rows, creating missing rows.
+    """
+    stmt = pg_insert(Rollup).from_select(["department_id", *COUNTERS, "updated_at"], source)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[Rollup.department_id],
+            set_={
+                **{name: getattr(Rollup, name) + getattr(stmt.excluded, name) for name in COUNTERS},
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+    )
+
+
+def _mandatory(training_id: int):
+    return exists().where(Training.id == training_id, Training.is_mandatory.is_(True))
+
+
+def user_added(db: Session, department_id: Optional[int]) -> None:
+    if department_id is None:
+        return
+    _apply(
+        db,
+        select(
+            literal(department_id),
+            literal(1),
+            literal(0),
+            literal(0),
+            literal(0),
+            literal(datetime.utcnow()),
+        ),
+    )
+
+
+def enrollment_created(db: Session, user_id: int, training_id: int) -> None:
+    _apply(
+        db,
+        select(
+            User.department_id,
+            literal(0),
+            literal(1),
+            literal(0),
+            literal(0),
+            literal(datetime.utcnow()),
+        ).where(User.id == user_id, User.department_id.is_not(None), _mandatory(training_id)),
+    )
+
+
+def enrollment_completed(db: Session, user_id: int, training_id: int) -> None:
+    """
+    Call after the enrollment's status is set to COMPLETED in this transaction.
+    The user counts towards "completed any" when this is their only completed
+    mandatory enrollment. The user row is locked first so that concurrent
+    completions by the same user see each other's rows in the count instead
+    of both counting themselves as the first.
+    """
+    db.execute(select(User.id).where(User.id == user_id).with_for_update())
+    completed_mandatory = (
+        select(func.count())
+        .select_from(Enrollment)
+        .join(Training, Training.id == Enrollment.training_id)
+        .where(
+            Enrollment.user_id == user_id,
+            Enrollment.status == EnrollmentStatus.COMPLETED,
+            Training.is_mandatory.is_(True),
+        )
+        .scalar_subquery()
+    )
+    _apply(
+        db,
+        select(
+            User.department_id,
+            literal(0),
+            literal(0),
+            literal(1),
+            case((completed_mandatory == 1, 1), else_=0),
+            literal(datetime.utcnow()),
+        ).where(User.id == user_id, User.department_id.is_not(None), _mandatory(training_id)),
+    )
+
+
+def rebuild_rollups(db: Session, department_ids: Optional[Iterable[Optional[int]]] = None) -> int:
+    """
+    Recompute the rollup rows of the given departments (all when None) from
+    the source tables in one statement. Returns the number of departments rebuilt.
+    """
+    if department_ids is not None:
+        department_ids = sorted({d for d in department_ids if d is not None})
+        if not department_ids:
+            return 0
+
+    is_mandatory = Training.is_mandatory.is_(True)
+    completed = Enrollment.status == EnrollmentStatus.COMPLETED
+    employees = (
+        select(User.department_id, func.count().label("total_employees"))
+        .where(User.department_id.is_not(None))
+        .group_by(User.department_id)
+        .subquery()
+    )
+    enrollments = (
+        select(
+            User.department_id,
+            func.count().label("mandatory_enrollments"),
+            func.count().filter(completed).label("mandatory_completions"),
+            func.count(func.distinct(Enrollment.user_id)).filter(completed).label("completed_any"),
+        )
+        .join(User, User.id == Enrollment.user_id)
+        .join(Training, and_(Training.id == Enrollment.training_id, is_mandatory))
+        .where(User.department_id.is_not(None))
+        .group_by(User.department_id)
+        .subquery()
+    )
+    source = (
+        select(
+            Department.id,
+            func.coalesce(employees.c.total_employees, 0),
+            func.coalesce(enrollments.c.mandatory_enrollments, 0),
+            func.coalesce(enrollments.c.mandatory_completions, 0),
+            func.coalesce(enrollments.c.completed_any, 0),
+            literal(datetime.utcnow()),
+        )
+        .outerjoin(employees, employees.c.department_id == Department.id)
+        .outerjoin(enrollments, enrollments.c.department_id == Department.id)
+    )
+
+    clear = delete(Rollup)
+    if department_ids is not None:
+        clear = clear.where(Rollup.department_id.in_(department_ids))
+        source = source.where(Department.id.in_(department_ids))
+    db.execute(clear)
+    return db.execute(
+        pg_insert(Rollup).from_select(["department_id", *COUNTERS, "updated_at"], source)
+    ).rowcount
+
+
+def main(argv=None) -> None:
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild department compliance rollups")
+    parser.add_argument("department_ids", nargs="*", type=int, help="departments to rebuild (default: all)")
+    args = parser.parse_args(argv)
+
+    with SessionLocal.begin() as db:
+        rebuilt = rebuild_rollups(db, args.department_ids or None)
+    print(json.dumps({"departments_rebuilt": rebuilt}))
+
+
+if __name__ == "__main__":
+    main()
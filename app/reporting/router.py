@@ -1,130 +1,154 @@
 # app/reporting/router.py
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 
-from app.auth.deps import get_current_user, get_db, require_roles
-from app.users_org.models import User, UserRole, Department
-from app.trainings.models import Training
-from app.enrollments_attendance.models import Enrollment, EnrollmentStatus
+from app.api.routing import UnitOfWorkRoute
+from app.api.files import file_response
+from app.auth.deps import TokenPrincipal, get_db, get_read_db, get_token_principal, require_roles
+from app.users_org.models import UserRole
+from app.reporting import schemas, service
+from app.reporting.jobs import MEDIA_TYPES, JobQueueFull, JobStatus, ReportJob, ReportKind, report_jobs
+from app.reporting.rollups import rebuild_rollups
+
+ADMIN_ROLES = (UserRole.ADMIN, UserRole.SUPER_ADMIN)
+
+router = APIRouter(prefix="/reports", tags=["reports"], route_class=UnitOfWorkRoute)
 
-router = APIRouter(prefix="/reports", tags=["reports"])
 
 @router.get(
     "/departments/mandatory-completion",
     dependencies=[Depends(require_roles(UserRole.ADMIN, UserRole.SUPER_ADMIN))],
 )
 def department_mandatory_completion(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
 ):
-    # Mandatory trainings
-    mandatory_training_ids = [
-        t.id
-        for t in db.query(Training.id).filter(Training.is_mandatory == True).all()
-    ]
-
-    # Employees per department
-    # Note: assumes User has department_id
-    dept_stats = (
-        db.query(
-            Department.id.label("department_id"),
-            Department.name.label("department_name"),
-            func.count(User.id).label("total_employees"),
-        )
-        .join(User, User.department_id == Department.id)
-        .group_by(Department.id, Department.name)
-        .all()
-    )
+    return service.department_mandatory_completion(db)
 
-    # Completed mandatory enrollments per department
-    completed_stats = (
-        db.query(
-            Department.id.label("department_id"),
-            func.count(func.distinct(Enrollment.user_id)).label("employees_completed_all"),
-        )
-        .join(User, User.department_id == Department.id)
-        .join(Enrollment, Enrollment.user_id == User.id)
-        .filter(
-            Enrollment.training_id.in_(mandatory_training_ids),
-            Enrollment.status == EnrollmentStatus.COMPLETED,
-        )
-        .group_by(Department.id)
-        .all()
-    )
 
-    completed_map = {row.department_id: row.employees_completed_all for row in completed_stats}
-
-    result = []
-    for row in dept_stats:
-        completed = completed_map.get(row.department_id, 0)
-        result.append(
-            {
-                "department_id": row.department_id,
-                "department_name": row.department_name,
-                "total_employees": row.total_employees,
-                "employees_completed_mandatory_any": completed,
-            }
-        )
-    return result
+@router.post(
+    "/rollups/rebuild",
+    dependencies=[Depends(require_roles(UserRole.ADMIN, UserRole.SUPER_ADMIN))],
+)
+def rebuild_compliance_rollups(
+    department_id: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Recompute the department compliance rollups from the source tables."""
+    return {"departments_rebuilt": rebuild_rollups(db, department_id)}
+
 
 @router.get(
     "/managers/mandatory-completion",
     dependencies=[Depends(require_roles(UserRole.MANAGER, UserRole.ADMIN, UserRole.SUPER_ADMIN))],
 )
 def manager_reportees_mandatory_completion(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    principal: TokenPrincipal = Depends(get_token_principal),
 ):
-    from app.users_org.models import ManagerRelationship
-
-    # reportees of this manager
-    reportee_ids = [
-        r.reportee_id
-        for r in db.query(ManagerRelationship).filter(ManagerRelationship.manager_id == current_user.id).all()
-    ]
-    if not reportee_ids:
-        return []
-
-    mandatory_training_ids = [
-        t.id
-        for t in db.query(Training.id).filter(Training.is_mandatory == True).all()
-    ]
-
-    # completed mandatory per reportee
-    completion_rows = (
-        db.query(
-            Enrollment.user_id,
-            func.count(func.distinct(Enrollment.training_id)).label("completed_count"),
-        )
-        .filter(
-            Enrollment.user_id.in_(reportee_ids),
-            Enrollment.training_id.in_(mandatory_training_ids),
-            Enrollment.status == EnrollmentStatus.COMPLETED,
-        )
-        .group_by(Enrollment.user_id)
-        .all()
+    return service.manager_mandatory_completion(db, principal.user_id)
+
+
+def _job_read(job: ReportJob) -> schemas.ReportJobRead:
+    return schemas.ReportJobRead(
+        id=job.id,
+        report=job.kind,
+        format=job.format,
+        params=job.params,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        rows=job.rows,
+        error=job.error,
     )
-    completion_map = {r.user_id: r.completed_count for r in completion_rows}
-
-    # total mandatory trainings
-    total_mandatory = len(mandatory_training_ids)
-
-    users = db.query(User).filter(User.id.in_(reportee_ids)).all()
-
-    result = []
-    for u in users:
-        completed = completion_map.get(u.id, 0)
-        result.append(
-            {
-                "user_id": u.id,
-                "name": u.full_name,
-                "email": u.email,
-                "completed_mandatory": completed,
-                "total_mandatory": total_mandatory,
-            }
+
+
+def _visible_job(job_id: str, principal: TokenPrincipal) -> ReportJob:
+    job = report_jobs.get(job_id)
+    if job is None or not (
+        principal.role in ADMIN_ROLES
+        or job.requested_by == principal.user_id
+        or job.params.get("manager_id") == principal.user_id
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report job not found")
+    return job
+
+
+@router.post(
+    "/jobs",
+    response_model=schemas.ReportJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_roles(UserRole.MANAGER, UserRole.ADMIN, UserRole.SUPER_ADMIN))],
+)
+def submit_report_job(
+    job_in: schemas.ReportJobCreate,
+    principal: TokenPrincipal = Depends(get_token_principal),
+):
+    """
+    Compute a report in the background. Poll GET /reports/jobs/{id} and fetch
+    the result from /download once it has SUCCEEDED. An identical request made
+    while a job is queued or running returns that job.
+    """
+    is_admin = principal.role in ADMIN_ROLES
+    if job_in.report == ReportKind.DEPARTMENT_MANDATORY_COMPLETION:
+        if not is_admin:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+        params = {}
+    else:
+        manager_id = job_in.manager_id or principal.user_id
+        if manager_id != principal.user_id and not is_admin:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+        params = {"manager_id": manager_id}
+
+    try:
+        job = report_jobs.submit(job_in.report, job_in.format, params, requested_by=principal.user_id)
+    except JobQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many report jobs in progress, please retry later",
+            headers={"Retry-After": "30"},
         )
+    return _job_read(job)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=schemas.ReportJobRead,
+    dependencies=[Depends(require_roles(UserRole.MANAGER, UserRole.ADMIN, UserRole.SUPER_ADMIN))],
+)
+def get_report_job(
+    job_id: str,
+    principal: TokenPrincipal = Depends(get_token_principal),
+):
+    return _job_read(_visible_job(job_id, principal))
+
 
-    return result
+@router.get(
+    "/jobs/{job_id}/download",
+    dependencies=[Depends(require_roles(UserRole.MANAGER, UserRole.ADMIN, UserRole.SUPER_ADMIN))],
+)
+def download_report_job(
+    job_id: str,
+    request: Request,
+    principal: TokenPrincipal = Depends(get_token_principal),
+):
+    job = _visible_job(job_id, principal)
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report job is {job.status.value}",
+        )
+    path = report_jobs.result_path(job)
+    if not path.exists():
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Report result has expired")
+
+    return file_response(
+        request,
+        path,
+        path.stat().st_size,
+        MEDIA_TYPES[job.format],
+        etag=f'"{job.id}"',
+        filename=f"{job.kind.value}-{job.id[:8]}.{job.format.value}",
+    )
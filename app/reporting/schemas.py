@@ -0,0 +1,27 @@
+# app/reporting/schemas.py
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.reporting.jobs import JobStatus, ReportKind, ResultFormat
+
+
+class ReportJobCreate(BaseModel):
+    report: ReportKind
+    format: ResultFormat = ResultFormat.CSV
+    # managers report: whose subtree; defaults to the caller
+    manager_id: Optional[int] = None
+
+
+class ReportJobRead(BaseModel):
+    id: str
+    report: ReportKind
+    format: ResultFormat
+    params: dict
+    status: JobStatus
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    rows: Optional[int] = None
+    error: Optional[str] = None
@@ -0,0 +1,100 @@
+# app/reporting/service.py
+"""
+Report computations shared by the synchronous /reports endpoints and the
+background report jobs (app.reporting.jobs). Each returns a list of flat dicts.
+"""
+from typing import List
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.users_org.models import Department, ManagerClosure, User
+from app.reporting.models import DepartmentComplianceRollup
+from app.trainings.models import Training
+from app.enrollments_attendance.models import Enrollment, EnrollmentStatus
+
+
+def _total_mandatory():
+    return (
+        select(func.count())
+        .select_from(Training)
+        .where(Training.is_mandatory.is_(True))
+        .scalar_subquery()
+    )
+
+
+def _completed_mandatory_per_user():
+    """user_id -> number of distinct mandatory trainings the user completed."""
+    return (
+        select(
+            Enrollment.user_id,
+            func.count(func.distinct(Enrollment.training_id)).label("completed_mandatory"),
+        )
+        .join(Training, Training.id == Enrollment.training_id)
+        .where(Training.is_mandatory.is_(True), Enrollment.status == EnrollmentStatus.COMPLETED)
+        .group_by(Enrollment.user_id)
+    )
+
+
+def department_mandatory_completion(db: Session) -> List[dict]:
+    total_mandatory = _total_mandatory()
+
+    # Employees who completed every mandatory training, per department
+    fully_compliant = _completed_mandatory_per_user().having(
+        func.count(func.distinct(Enrollment.training_id)) == total_mandatory
+    ).subquery()
+    compliant_per_department = (
+        select(User.department_id, func.count().label("employees"))
+        .join(fully_compliant, fully_compliant.c.user_id == User.id)
+        .group_by(User.department_id)
+        .subquery()
+    )
+
+    rows = db.execute(
+        select(
+            DepartmentComplianceRollup.department_id,
+            Department.name.label("department_name"),
+            DepartmentComplianceRollup.total_employees,
+            DepartmentComplianceRollup.mandatory_enrollments,
+            DepartmentComplianceRollup.mandatory_completions,
+            DepartmentComplianceRollup.employees_completed_mandatory_any,
+            # with no mandatory trainings everyone is compliant
+            case(
+                (total_mandatory == 0, DepartmentComplianceRollup.total_employees),
+                else_=func.coalesce(compliant_per_department.c.employees, 0),
+            ).label("employees_completed_all_mandatory"),
+            total_mandatory.label("total_mandatory"),
+        )
+        .join(Department, Department.id == DepartmentComplianceRollup.department_id)
+        .outerjoin(
+            compliant_per_department,
+            compliant_per_department.c.department_id == DepartmentComplianceRollup.department_id,
+        )
+        .where(DepartmentComplianceRollup.total_employees > 0)
+        .order_by(DepartmentComplianceRollup.department_id)
+    ).all()
+    return [row._asdict() for row in rows]
+
+
+def manager_mandatory_completion(db: Session, manager_id: int) -> List[dict]:
+    total_mandatory = _total_mandatory()
+    completed = _completed_mandatory_per_user().subquery()
+    completed_mandatory = func.coalesce(completed.c.completed_mandatory, 0)
+
+    rows = db.execute(
+        select(
+            User.id.label("user_id"),
+            User.full_name.label("name"),
+            User.email,
+            # 1 for direct reports, 2 for their reports, ...
+            ManagerClosure.depth,
+            completed_mandatory.label("completed_mandatory"),
+            total_mandatory.label("total_mandatory"),
+            (completed_mandatory == total_mandatory).label("completed_all_mandatory"),
+        )
+        .outerjoin(completed, completed.c.user_id == User.id)
+        .join(ManagerClosure, ManagerClosure.descendant_id == User.id)
+        .where(ManagerClosure.ancestor_id == manager_id)
+        .order_by(ManagerClosure.depth, User.id)
+    ).all()
+    return [row._asdict() for row in rows]
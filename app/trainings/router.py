@@ -1,16 +1,36 @@
 # app/trainings/router.py
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.auth.deps import get_current_user, require_roles, get_db
+from app.api.routing import UnitOfWorkRoute
+from app.api.conditional import not_modified, resource_etag, set_etag
+from app.api.files import etag_matches
+from app.api.pagination import PageParams, paginate
+from app.api.projection import json_page_response, projection_columns
+from app.auth.cache import CachedUser
+from app.auth.deps import (
+    TokenPrincipal,
+    get_async_read_db,
+    get_current_user_async,
+    get_db,
+    get_read_db,
+    get_token_principal,
+    require_roles,
+)
+from app.db import queries
+from app.db.versions import trainings_key, versions
+from app.reporting.rollups import rebuild_rollups
 from app.users_org.models import User, UserRole
 from app.trainings import models, schemas
 
 from app.enrollments_attendance.models import Enrollment, EnrollmentStatus
 
-router = APIRouter(prefix="/trainings", tags=["trainings"])
+router = APIRouter(prefix="/trainings", tags=["trainings"], route_class=UnitOfWorkRoute)
 
 
 @router.post(
@@ -22,7 +42,7 @@ router = APIRouter(prefix="/trainings", tags=["trainings"])
 def create_training(
     training_in: schemas.TrainingCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    principal: TokenPrincipal = Depends(get_token_principal),
 ):
     training = models.Training(
         title=training_in.title,
@@ -31,35 +51,92 @@ def create_training(
         duration_hours=training_in.duration_hours,
         mode=training_in.mode,
         is_mandatory=training_in.is_mandatory,
-        created_by_id=current_user.id,
+        created_by_id=principal.user_id,
     )
 
     db.add(training)
-    db.commit()
-    db.refresh(training)
+    db.flush()
+    versions.bump(db, trainings_key())
 
     # For mandatory trainings, create a pending approval request
     if training.is_mandatory:
         approval = models.TrainingApproval(
             training_id=training.id,
-            requested_by_id=current_user.id,
+            requested_by_id=principal.user_id,
         )
         db.add(approval)
-        db.commit()
-        db.refresh(approval)
+        db.flush()
 
     return training
 
 
+@router.patch(
+    "/{training_id}",
+    response_model=schemas.TrainingRead,
+    dependencies=[Depends(require_roles(UserRole.ADMIN, UserRole.SUPER_ADMIN))],
+)
+def update_training(
+    training_id: int,
+    training_in: schemas.TrainingUpdate,
+    db: Session = Depends(get_db),
+):
+    training = queries.training_by_id(db, training_id)
+    if not training:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Training not found",
+        )
+
+    changes = training_in.model_dump(exclude_unset=True)
+    mandatory_changed = "is_mandatory" in changes and changes["is_mandatory"] != training.is_mandatory
+    for field, value in changes.items():
+        setattr(training, field, value)
+    training.updated_at = datetime.utcnow()
+
+    db.flush()
+    versions.bump(db, trainings_key())
+    if mandatory_changed:
+        # only departments with enrollments in this training are affected
+        rebuild_rollups(
+            db,
+            db.scalars(
+                select(User.department_id)
+                .join(Enrollment, Enrollment.user_id == User.id)
+                .where(Enrollment.training_id == training_id)
+                .distinct()
+            ).all(),
+        )
+    db.refresh(training)
+    return training
+
+
 @router.get(
     "",
     response_model=List[schemas.TrainingRead],
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_user_async)],
 )
-def list_trainings(
-    db: Session = Depends(get_db),
+async def list_trainings(
+    request: Request,
+    department_id: Optional[int] = None,
+    is_mandatory: Optional[bool] = None,
+    mode: Optional[models.TrainingMode] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    return db.query(models.Training).all()
+    etag = resource_etag(request, trainings_key(), await versions.get_async(db, trainings_key()))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    stmt = select(*projection_columns(schemas.TrainingRead, models.Training))
+    if department_id is not None:
+        stmt = stmt.where(models.Training.department_id == department_id)
+    if is_mandatory is not None:
+        stmt = stmt.where(models.Training.is_mandatory == is_mandatory)
+    if mode is not None:
+        stmt = stmt.where(models.Training.mode == mode)
+
+    result = await db.execute(paginate(stmt, models.Training.id, page))
+    return set_etag(json_page_response(result.all(), page), etag)
 
 
 @router.post(
@@ -71,9 +148,8 @@ def list_trainings(
 def create_training_assignment(
     assignment_in: schemas.TrainingAssignmentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    training = db.query(models.Training).filter(models.Training.id == assignment_in.training_id).first()
+    training = queries.training_by_id(db, assignment_in.training_id)
     if not training:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -108,7 +184,7 @@ def create_training_assignment(
     )
 
     db.add(assignment)
-    db.commit()
+    db.flush()
     db.refresh(assignment)
     return assignment
 
@@ -119,29 +195,39 @@ def create_training_assignment(
     dependencies=[Depends(require_roles(UserRole.ADMIN, UserRole.SUPER_ADMIN))],
 )
 def list_training_assignments(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    training_id: Optional[int] = None,
+    target_type: Optional[models.AssignmentTargetType] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
 ):
-    return db.query(models.TrainingAssignment).all()
-
-@router.get(
-    "/mandatory/status",
-    dependencies=[Depends(get_current_user)],
-)
-def get_my_mandatory_training_status(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    stmt = select(*projection_columns(schemas.TrainingAssignmentRead, models.TrainingAssignment))
+    if training_id is not None:
+        stmt = stmt.where(models.TrainingAssignment.training_id == training_id)
+    if target_type is not None:
+        stmt = stmt.where(models.TrainingAssignment.target_type == target_type)
+
+    rows = db.execute(paginate(stmt, models.TrainingAssignment.id, page)).all()
+    return json_page_response(rows, page)
+
+@router.get("/mandatory/status")
+async def get_my_mandatory_training_status(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CachedUser = Depends(get_current_user_async),
 ):
     # Trainings marked mandatory
-    mandatory_trainings = db.query(models.Training).filter(models.Training.is_mandatory == True).all()
+    mandatory_trainings = (
+        await db.execute(
+            select(models.Training.id, models.Training.title).where(models.Training.is_mandatory == True)
+        )
+    ).all()
 
-    # Enrollments for current user
-    enrollments = (
-        db.query(Enrollment)
-        .filter(Enrollment.user_id == current_user.id)
-        .all()
-    )
-    enrollment_by_training = {e.training_id: e for e in enrollments}
+    # Enrollment status per training for current user
+    enrollment_rows = (
+        await db.execute(
+            select(Enrollment.training_id, Enrollment.status).where(Enrollment.user_id == current_user.id)
+        )
+    ).all()
+    enrollment_by_training = {row.training_id: row for row in enrollment_rows}
 
     result = []
     for t in mandatory_trainings:
@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from app.trainings.models import (
     TrainingMode,
     AssignmentTargetType,
@@ -23,6 +23,23 @@ class TrainingCreate(TrainingBase):
     pass
 
 
+class TrainingUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    department_id: Optional[int] = None
+    duration_hours: Optional[int] = None
+    mode: Optional[TrainingMode] = None
+    is_mandatory: Optional[bool] = None
+
+    @field_validator("title", "duration_hours", "mode", "is_mandatory")
+    @classmethod
+    def not_null(cls, value):
+        # these fields may be omitted, but the columns are NOT NULL
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
 class TrainingRead(TrainingBase):
     id: int
     created_by_id: int
@@ -0,0 +1,149 @@
+# app/users_org/hierarchy.py
+"""
+Maintenance of and lookups on manager_closure, the transitive closure of
+manager_relationships. "All reportees under X" and "is Y under X" become
+single indexed lookups.
+
+Adding an edge inserts the cross product of the manager's ancestors and the
+reportee's descendants. Removing one recomputes, with a recursive CTE, the
+ancestors of every user below the removed edge, since they may still be
+reachable through another chain. The table is filled when it is first
+created at startup (app.core.db_init). Full rebuild:
+
+    python -m app.users_org.hierarchy
+"""
+import argparse
+import json
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, exists, func, literal, select, text, true, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.users_org.models import ManagerClosure, ManagerRelationship
+
+# Guards the recursive walk against cycles in the raw edges
+MAX_DEPTH = 64
+
+# Postgres advisory lock serializing changes to manager_relationships
+EDGES_LOCK_KEY = 724_310_002
+
+
+def lock_edges(db: Session) -> None:
+    """
+    Serialize manager relationship changes until the transaction ends, so a
+    cycle check and the edge insert it guards cannot interleave with another.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": EDGES_LOCK_KEY})
+
+
+def reportee_ids(manager_id: int):
+    """Subquery of every user anywhere below ``manager_id``."""
+    return select(ManagerClosure.descendant_id).where(ManagerClosure.ancestor_id == manager_id)
+
+
+def is_under(db: Session, manager_id: int, user_id: int) -> bool:
+    return db.scalar(
+        select(
+            exists().where(
+                ManagerClosure.ancestor_id == manager_id,
+                ManagerClosure.descendant_id == user_id,
+            )
+        )
+    )
+
+
+def add_edge(db: Session, manager_id: int, reportee_id: int) -> None:
+    """Extend the closure for a new manager_relationships row."""
+    above = union_all(
+        select(ManagerClosure.ancestor_id.label("user_id"), ManagerClosure.depth.label("depth")).where(
+            ManagerClosure.descendant_id == manager_id
+        ),
+        select(literal(manager_id).label("user_id"), literal(0).label("depth")),
+    ).subquery()
+    below = union_all(
+        select(ManagerClosure.descendant_id.label("user_id"), ManagerClosure.depth.label("depth")).where(
+            ManagerClosure.ancestor_id == reportee_id
+        ),
+        select(literal(reportee_id).label("user_id"), literal(0).label("depth")),
+    ).subquery()
+
+    stmt = pg_insert(ManagerClosure).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        select(above.c.user_id, below.c.user_id, above.c.depth + below.c.depth + 1)
+        .select_from(above)
+        .join(below, true())
+        .where(above.c.user_id != below.c.user_id),
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ManagerClosure.ancestor_id, ManagerClosure.descendant_id],
+            set_={"depth": func.least(ManagerClosure.depth, stmt.excluded.depth)},
+        )
+    )
+
+
+def remove_edge(db: Session, reportee_id: int) -> None:
+    """
+    Repair the closure after the manager_relationships row(s) above
+    ``reportee_id`` were deleted and flushed.
+    """
+    subtree = db.scalars(reportee_ids(reportee_id)).all()
+    rebuild_closure(db, [reportee_id, *subtree])
+
+
+def rebuild_closure(db: Session, descendant_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute the ancestors of the given users (everyone when None) from
+    manager_relationships. Returns the number of closure rows written.
+    """
+    edges = select(
+        ManagerRelationship.reportee_id.label("descendant_id"),
+        ManagerRelationship.manager_id.label("ancestor_id"),
+        literal(1).label("depth"),
+    )
+    if descendant_ids is not None:
+        descendant_ids = sorted(set(descendant_ids))
+        if not descendant_ids:
+            return 0
+        edges = edges.where(ManagerRelationship.reportee_id.in_(descendant_ids))
+
+    paths = edges.cte("paths", recursive=True)
+    paths = paths.union_all(
+        select(
+            paths.c.descendant_id,
+            ManagerRelationship.manager_id,
+            paths.c.depth + 1,
+        )
+        .join(ManagerRelationship, ManagerRelationship.reportee_id == paths.c.ancestor_id)
+        .where(paths.c.depth < MAX_DEPTH)
+    )
+    source = (
+        select(paths.c.ancestor_id, paths.c.descendant_id, func.min(paths.c.depth))
+        .where(paths.c.ancestor_id != paths.c.descendant_id)
+        .group_by(paths.c.ancestor_id, paths.c.descendant_id)
+    )
+
+    clear = delete(ManagerClosure)
+    if descendant_ids is not None:
+        clear = clear.where(ManagerClosure.descendant_id.in_(descendant_ids))
+    db.execute(clear)
+    return db.execute(
+        pg_insert(ManagerClosure).from_select(["ancestor_id", "descendant_id", "depth"], source)
+    ).rowcount
+
+
+def main(argv=None) -> None:
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild the manager closure table")
+    parser.parse_args(argv)
+
+    with SessionLocal.begin() as db:
+        rows = rebuild_closure(db)
+    print(json.dumps({"closure_rows": rows}))
+
+
+if __name__ == "__main__":
+    main()
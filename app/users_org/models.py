@@ -1,6 +1,8 @@
 # app/users_org/models.py
 import enum
-from sqlalchemy import Boolean, Column, Enum, ForeignKey, Integer, String
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -23,6 +25,10 @@ class User(Base):
 
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
+    # bumped whenever previously issued tokens must stop working
+    token_version = Column(Integer, default=0, nullable=False)
+    # watermark for the incremental reload of app.auth.revocation
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
 
     department = relationship("Department", back_populates="users")
 
@@ -44,6 +50,19 @@ class ManagerRelationship(Base):
     manager = relationship("User", foreign_keys=[manager_id], backref="reportees_rel")
     reportee = relationship("User", foreign_keys=[reportee_id], backref="manager_rel")
 
+class ManagerClosure(Base):
+    """
+    Transitive closure of manager_relationships: one row per (manager, reportee)
+    pair at any depth, with the length of the shortest chain. Maintained by
+    app.users_org.hierarchy.
+    """
+    __tablename__ = "manager_closure"
+    __table_args__ = (Index("ix_manager_closure_descendant", "descendant_id", "ancestor_id"),)
+
+    ancestor_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
 class OrgUnit(Base):
     __tablename__ = "org_units"
 
@@ -1,23 +1,34 @@
 # app/users_org/router.py
-from typing import List
+import io
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
-from app.users_org import models, schemas
-from app.auth.security import hash_password
-from app.auth.deps import get_current_user, require_roles
+from app.api.routing import UnitOfWorkRoute
+from app.api.pagination import PageParams, paginate
+from app.api.projection import json_page_response, projection_columns
+from app.db import queries
+from app.db.session import after_commit
+from app.reporting import rollups
+from app.users_org import hierarchy, models, schemas
+from app.users_org.sync import FeedFormat, SyncEntity, detect_format, run_sync
+from app.auth.hashing import password_hasher
+from app.auth.cache import invalidate_user
+from app.auth.revocation import revocations
+from app.auth.deps import get_db, get_read_db, require_roles
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=UnitOfWorkRoute)
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def _check_department(db: Session, department_id: Optional[int]) -> None:
+    if department_id is not None and db.get(models.Department, department_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown department_id {department_id}",
+        )
 
 
 @router.post(
@@ -26,27 +37,33 @@ def get_db():
     status_code=status.HTTP_201_CREATED,
     dependencies=[Depends(require_roles(models.UserRole.ADMIN, models.UserRole.SUPER_ADMIN))],
 )
-def create_user(
+async def create_user(
     user_in: schemas.UserCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    existing = db.query(models.User).filter(models.User.email == user_in.email).first()
+    existing = await run_in_threadpool(
+        lambda: queries.user_by_email(db, user_in.email)
+    )
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     user = models.User(
         email=user_in.email,
         full_name=user_in.full_name,
-        password_hash=hash_password(user_in.password),
+        password_hash=await password_hasher.hash(user_in.password),
         role=user_in.role,
         department_id=user_in.department_id,
         is_active=user_in.is_active,
     )
 
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    def _save():
+        _check_department(db, user.department_id)
+        db.add(user)
+        db.flush()
+        rollups.user_added(db, user.department_id)
+        db.refresh(user)
+
+    await run_in_threadpool(_save)
     return user
 
 
@@ -56,7 +73,157 @@ def create_user(
     dependencies=[Depends(require_roles(models.UserRole.ADMIN, models.UserRole.SUPER_ADMIN))],
 )
 def list_users(
+    role: Optional[models.UserRole] = None,
+    department_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    stmt = select(*projection_columns(schemas.UserRead, models.User))
+    if role is not None:
+        stmt = stmt.where(models.User.role == role)
+    if department_id is not None:
+        stmt = stmt.where(models.User.department_id == department_id)
+    if is_active is not None:
+        stmt = stmt.where(models.User.is_active == is_active)
+
+    rows = db.execute(paginate(stmt, models.User.id, page)).all()
+    return json_page_response(rows, page)
+
+
+@router.patch(
+    "/{user_id}",
+    response_model=schemas.UserRead,
+    dependencies=[Depends(require_roles(models.UserRole.ADMIN, models.UserRole.SUPER_ADMIN))],
+)
+def update_user(
+    user_id: int,
+    user_in: schemas.UserUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    return db.query(models.User).all()
+    user = queries.user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    changes = user_in.model_dump(exclude_unset=True)
+    if "department_id" in changes:
+        _check_department(db, changes["department_id"])
+    old_department_id = user.department_id
+    revoke_tokens = (
+        ("role" in changes and changes["role"] != user.role)
+        or ("is_active" in changes and changes["is_active"] != user.is_active)
+    )
+
+    for field, value in changes.items():
+        setattr(user, field, value)
+    if revoke_tokens:
+        # Role-gated endpoints trust the role claim, so old tokens must go
+        user.token_version = (user.token_version or 0) + 1
+
+    db.flush()
+    if user.department_id != old_department_id:
+        # moves the user's enrollments between departments
+        rollups.rebuild_rollups(db, [old_department_id, user.department_id])
+    db.refresh(user)
+
+    # Role and activation are resolved from the auth cache on every request
+    after_commit(db, lambda: invalidate_user(user_id))
+    if revoke_tokens:
+        token_version = user.token_version
+        is_active = user.is_active
+        after_commit(db, lambda: revocations.revoke(user_id, token_version))
+        after_commit(db, lambda: revocations.set_active(user_id, is_active))
+    return user
+
+
+@router.post(
+    "/managers",
+    response_model=schemas.ManagerRelationshipRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_roles(models.UserRole.ADMIN, models.UserRole.SUPER_ADMIN))],
+)
+def add_manager_relationship(
+    edge_in: schemas.ManagerRelationshipCreate,
+    db: Session = Depends(get_db),
+):
+    if edge_in.manager_id == edge_in.reportee_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A user cannot manage themselves")
+    found = db.scalars(
+        select(models.User.id).where(models.User.id.in_([edge_in.manager_id, edge_in.reportee_id]))
+    ).all()
+    if len(found) != 2:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    hierarchy.lock_edges(db)
+    if hierarchy.is_under(db, edge_in.reportee_id, edge_in.manager_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The manager already reports to this user",
+        )
+    existing = db.scalars(
+        select(models.ManagerRelationship).where(
+            models.ManagerRelationship.manager_id == edge_in.manager_id,
+            models.ManagerRelationship.reportee_id == edge_in.reportee_id,
+        )
+    ).first()
+    if existing:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Relationship already exists")
+
+    edge = models.ManagerRelationship(manager_id=edge_in.manager_id, reportee_id=edge_in.reportee_id)
+    db.add(edge)
+    db.flush()
+    hierarchy.add_edge(db, edge.manager_id, edge.reportee_id)
+    return edge
+
+
+@router.delete(
+    "/{manager_id}/reportees/{reportee_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_roles(models.UserRole.ADMIN, models.UserRole.SUPER_ADMIN))],
+)
+def remove_manager_relationship(
+    manager_id: int,
+    reportee_id: int,
+    db: Session = Depends(get_db),
+):
+    hierarchy.lock_edges(db)
+    deleted = db.execute(
+        delete(models.ManagerRelationship)
+        .where(
+            models.ManagerRelationship.manager_id == manager_id,
+            models.ManagerRelationship.reportee_id == reportee_id,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not deleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Relationship not found")
+    hierarchy.remove_edge(db, reportee_id)
+
+
+@router.post(
+    "/sync/{entity}",
+    dependencies=[Depends(require_roles(models.UserRole.ADMIN, models.UserRole.SUPER_ADMIN))],
+)
+def sync_from_hris(
+    entity: SyncEntity,
+    file: UploadFile = File(...),
+    format: Optional[FeedFormat] = None,
+    deactivate_missing: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk sync departments, users or manager relationships from a CSV/NDJSON
+    HRIS feed. Only the difference with the current state is written.
+    Users absent from a users feed are deactivated only with
+    ``deactivate_missing``, so a partial feed cannot lock people out.
+    """
+    fmt = format or detect_format(file.filename)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = run_sync(db, entity, stream, fmt, deactivate_missing=deactivate_missing)
+    except (ValueError, KeyError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid feed: {exc}")
+    finally:
+        stream.detach()
+
+    after_commit(db, report.after_commit)
+    return report.as_dict()
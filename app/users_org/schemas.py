@@ -1,5 +1,5 @@
 # app/users_org/schemas.py
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional
 from .models import UserRole
 
@@ -16,6 +16,33 @@ class UserCreate(UserBase):
     password: str
 
 
+class UserUpdate(BaseModel):
+    full_name: Optional[str] = None
+    role: Optional[UserRole] = None
+    department_id: Optional[int] = None
+    is_active: Optional[bool] = None
+
+    @field_validator("full_name", "role", "is_active")
+    @classmethod
+    def not_null(cls, value):
+        # these fields may be omitted, but the columns are NOT NULL
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
+class ManagerRelationshipCreate(BaseModel):
+    manager_id: int
+    reportee_id: int
+
+
+class ManagerRelationshipRead(ManagerRelationshipCreate):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
 class UserRead(UserBase):
     id: int
 
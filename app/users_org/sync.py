@@ -0,0 +1,414 @@
+# app/users_org/sync.py
+"""
+Diff-based bulk sync of HRIS feeds into departments, users and manager
+relationships. Feeds are CSV (with a header row) or NDJSON, one record per
+row/line:
+
+    departments: name
+    users:       email, full_name, role?, department?, is_active?
+    managers:    manager_email, reportee_email
+
+The feed is compared with the current table contents and only the
+difference is written, in chunked set-based statements. The caller owns
+the transaction. CLI usage:
+
+    python -m app.users_org.sync users people.csv
+"""
+import argparse
+import csv
+import enum
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.auth.cache import invalidate_user
+from app.auth.revocation import revocations
+from app.auth.security import UNUSABLE_PASSWORD
+from app.reporting.rollups import rebuild_rollups
+from app.users_org.hierarchy import lock_edges, rebuild_closure
+from app.users_org.models import Department, ManagerRelationship, User, UserRole
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 50
+
+
+class FeedValueError(ValueError):
+    """A field of one feed record has the wrong type; the row is skipped."""
+
+
+class SyncEntity(str, enum.Enum):
+    DEPARTMENTS = "departments"
+    USERS = "users"
+    MANAGERS = "managers"
+
+
+class FeedFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+@dataclass
+class SyncReport:
+    entity: str
+    rows_read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    deactivated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+    # user id -> new token version, applied to the auth caches after commit
+    revoked_tokens: Dict[int, int] = field(default_factory=dict)
+    # user id -> is_active, for users whose activation changed
+    activation_changes: Dict[int, bool] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("revoked_tokens")
+        data.pop("activation_changes")
+        return data
+
+    def after_commit(self) -> None:
+        for user_id, token_version in self.revoked_tokens.items():
+            invalidate_user(user_id)
+            revocations.revoke(user_id, token_version)
+        for user_id, is_active in self.activation_changes.items():
+            revocations.set_active(user_id, is_active)
+
+    def skip(self, line: int, reason: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"row {line}: {reason}")
+
+    def finish(self, started: float) -> "SyncReport":
+        self.elapsed_seconds = round(time.perf_counter() - started, 3)
+        if self.elapsed_seconds > 0:
+            self.rows_per_second = round(self.rows_read / self.elapsed_seconds, 1)
+        return self
+
+
+def detect_format(filename: Optional[str]) -> FeedFormat:
+    if filename and filename.lower().endswith((".ndjson", ".jsonl", ".json")):
+        return FeedFormat.NDJSON
+    return FeedFormat.CSV
+
+
+def iter_records(stream: TextIO, fmt: FeedFormat) -> Iterator[dict]:
+    if fmt == FeedFormat.CSV:
+        for row in csv.DictReader(stream):
+            yield {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k}
+        return
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if line:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"line {number} is not a JSON object")
+            yield record
+
+
+def _chunks(items: List[dict], size: int = CHUNK_SIZE) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _text(record: dict, name: str) -> str:
+    """A string field; NDJSON values can be any JSON type."""
+    value = record.get(name)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise FeedValueError(f"{name} must be a string")
+    return value.strip()
+
+
+def _parse_bool(value, default: Optional[bool] = True) -> Optional[bool]:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    if not isinstance(value, (str, int)):
+        raise FeedValueError("is_active must be a boolean or a string")
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "active")
+
+
+def sync_departments(db: Session, records: Iterable[dict]) -> SyncReport:
+    started = time.perf_counter()
+    report = SyncReport(entity=SyncEntity.DEPARTMENTS.value)
+
+    existing = set(db.scalars(select(Department.name)).all())
+    new_names: Dict[str, None] = {}
+    for line, record in enumerate(records, start=1):
+        report.rows_read += 1
+        try:
+            name = _text(record, "name")
+        except FeedValueError as exc:
+            report.skip(line, str(exc))
+            continue
+        if not name:
+            report.skip(line, "missing name")
+        elif name in existing or name in new_names:
+            report.unchanged += 1
+        else:
+            new_names[name] = None
+
+    rows = [{"name": name} for name in new_names]
+    for chunk in _chunks(rows):
+        db.execute(insert(Department), chunk)
+    report.inserted = len(rows)
+    return report.finish(started)
+
+
+def sync_users(db: Session, records: Iterable[dict], deactivate_missing: bool = False) -> SyncReport:
+    """
+    Upsert users by email. New users get an unusable password and must have one
+    set before they can log in. Empty or absent role, department and is_active
+    values leave existing users unchanged. With ``deactivate_missing``, active users absent
+    from the feed are deactivated (super admins are never touched).
+    """
+    started = time.perf_counter()
+    report = SyncReport(entity=SyncEntity.USERS.value)
+
+    departments = dict(db.execute(select(Department.name, Department.id)).all())
+    current = {
+        row.email: row
+        for row in db.execute(
+            select(
+                User.id,
+                User.email,
+                User.full_name,
+                User.role,
+                User.department_id,
+                User.is_active,
+                User.token_version,
+            )
+        )
+    }
+
+    current_by_id = {row.id: row for row in current.values()}
+
+    seen = set()
+    inserts: List[dict] = []
+    updates: List[dict] = []
+    for line, record in enumerate(records, start=1):
+        report.rows_read += 1
+        try:
+            email = _text(record, "email")
+            full_name = _text(record, "full_name")
+        except FeedValueError as exc:
+            report.skip(line, str(exc))
+            continue
+        if not email or not full_name:
+            report.skip(line, "email and full_name are required")
+            continue
+        if email in seen:
+            report.skip(line, f"duplicate email {email}")
+            continue
+        seen.add(email)
+        try:
+            role_name = _text(record, "role")
+            department_name = _text(record, "department")
+            is_active = _parse_bool(record.get("is_active"), default=None)
+        except FeedValueError as exc:
+            report.skip(line, str(exc))
+            continue
+
+        existing = current.get(email)
+        try:
+            role = UserRole(role_name) if role_name else (
+                existing.role if existing else UserRole.EMPLOYEE
+            )
+        except ValueError:
+            report.skip(line, f"unknown role {role_name}")
+            continue
+
+        if department_name and department_name not in departments:
+            report.skip(line, f"unknown department {department_name}")
+            continue
+        # optional columns that are absent or empty keep the current value
+        if department_name:
+            department_id = departments[department_name]
+        else:
+            department_id = existing.department_id if existing else None
+        if is_active is None:
+            is_active = existing.is_active if existing else True
+
+        if existing is None:
+            inserts.append(
+                {
+                    "email": email,
+                    "full_name": full_name,
+                    "password_hash": UNUSABLE_PASSWORD,
+                    "role": role,
+                    "department_id": department_id,
+                    "is_active": is_active,
+                    "token_version": 0,
+                }
+            )
+        elif (full_name, role, department_id, is_active) != (
+            existing.full_name,
+            existing.role,
+            existing.department_id,
+            existing.is_active,
+        ):
+            revoke = role != existing.role or is_active != existing.is_active
+            updates.append(
+                {
+                    "id": existing.id,
+                    "full_name": full_name,
+                    "role": role,
+                    "department_id": department_id,
+                    "is_active": is_active,
+                    "token_version": existing.token_version + (1 if revoke else 0),
+                }
+            )
+        else:
+            report.unchanged += 1
+
+    for chunk in _chunks(inserts):
+        db.execute(insert(User), chunk)
+    for chunk in _chunks(updates):
+        # bulk UPDATE by primary key, executed as a single executemany per chunk
+        db.execute(update(User), chunk)
+    report.inserted = len(inserts)
+    report.updated = len(updates)
+
+    moved = {row["department_id"] for row in inserts}
+    for row in updates:
+        old_department_id = current_by_id[row["id"]].department_id
+        if row["department_id"] != old_department_id:
+            moved.update((old_department_id, row["department_id"]))
+    rebuild_rollups(db, moved)
+
+    report.revoked_tokens = {row["id"]: row["token_version"] for row in updates}
+    report.activation_changes = {
+        row["id"]: row["is_active"]
+        for row in updates
+        if row["is_active"] != current_by_id[row["id"]].is_active
+    }
+    if deactivate_missing:
+        missing = [
+            row
+            for email, row in current.items()
+            if email not in seen and row.is_active and row.role != UserRole.SUPER_ADMIN
+        ]
+        for chunk in _chunks(missing):
+            db.execute(
+                update(User)
+                .where(User.id.in_([row.id for row in chunk]))
+                .values(is_active=False, token_version=User.token_version + 1)
+                .execution_options(synchronize_session=False)
+            )
+        report.deactivated = len(missing)
+        report.revoked_tokens.update({row.id: row.token_version + 1 for row in missing})
+        report.activation_changes.update({row.id: False for row in missing})
+
+    return report.finish(started)
+
+
+def sync_managers(db: Session, records: Iterable[dict]) -> SyncReport:
+    """Make manager_relationships match the feed exactly."""
+    started = time.perf_counter()
+    report = SyncReport(entity=SyncEntity.MANAGERS.value)
+
+    lock_edges(db)
+    user_ids = dict(db.execute(select(User.email, User.id)).all())
+    current = {
+        (row.manager_id, row.reportee_id): row.id
+        for row in db.execute(
+            select(ManagerRelationship.id, ManagerRelationship.manager_id, ManagerRelationship.reportee_id)
+        )
+    }
+
+    desired = set()
+    for line, record in enumerate(records, start=1):
+        report.rows_read += 1
+        try:
+            manager_id = user_ids.get(_text(record, "manager_email"))
+            reportee_id = user_ids.get(_text(record, "reportee_email"))
+        except FeedValueError as exc:
+            report.skip(line, str(exc))
+            continue
+        if manager_id is None or reportee_id is None:
+            report.skip(line, "unknown manager_email or reportee_email")
+        elif manager_id == reportee_id:
+            report.skip(line, "a user cannot manage themselves")
+        else:
+            desired.add((manager_id, reportee_id))
+
+    inserts = [{"manager_id": m, "reportee_id": r} for (m, r) in desired if (m, r) not in current]
+    stale_ids = [edge_id for edge, edge_id in current.items() if edge not in desired]
+
+    for chunk in _chunks(inserts):
+        db.execute(insert(ManagerRelationship), chunk)
+    for chunk in _chunks(stale_ids):
+        db.execute(
+            delete(ManagerRelationship)
+            .where(ManagerRelationship.id.in_(chunk))
+            .execution_options(synchronize_session=False)
+        )
+    if inserts or stale_ids:
+        rebuild_closure(db)
+    report.inserted = len(inserts)
+    report.deleted = len(stale_ids)
+    report.unchanged = len(desired) - len(inserts)
+    return report.finish(started)
+
+
+def run_sync(
+    db: Session,
+    entity: SyncEntity,
+    stream: TextIO,
+    fmt: FeedFormat,
+    deactivate_missing: bool = False,
+) -> SyncReport:
+    records = iter_records(stream, fmt)
+    if entity == SyncEntity.DEPARTMENTS:
+        return sync_departments(db, records)
+    if entity == SyncEntity.USERS:
+        return sync_users(db, records, deactivate_missing=deactivate_missing)
+    return sync_managers(db, records)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Bulk sync an HRIS feed")
+    parser.add_argument("entity", choices=[e.value for e in SyncEntity])
+    parser.add_argument("path", help="CSV or NDJSON file, '-' for stdin")
+    parser.add_argument("--format", choices=[f.value for f in FeedFormat], default=None)
+    parser.add_argument(
+        "--deactivate-missing", action="store_true", help="deactivate active users absent from the feed"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="compute the diff and roll it back")
+    args = parser.parse_args(argv)
+
+    fmt = FeedFormat(args.format) if args.format else detect_format(args.path)
+    db = SessionLocal()
+    try:
+        if args.path == "-":
+            report = run_sync(db, SyncEntity(args.entity), sys.stdin, fmt, args.deactivate_missing)
+        else:
+            with open(args.path, encoding="utf-8-sig", newline="") as stream:
+                report = run_sync(db, SyncEntity(args.entity), stream, fmt, args.deactivate_missing)
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+            report.after_commit()
+    finally:
+        db.close()
+
+    print(json.dumps(report.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
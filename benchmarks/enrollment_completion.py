@@ -0,0 +1,143 @@
+# benchmarks/enrollment_completion.py
+"""
+Enrollment completion under parallel load: complete_enrollment (conditional
+UPDATE, hours incremented in SQL, side effects queued in the outbox) against
+the previous handler body (load enrollment, training and profile, add the
+history entry, read-modify-write the hours, award badges inline). Each
+request completes a different enrollment, spread over --users users so
+completions of the same user contend for their profile row, and commits
+like the endpoint's unit of work. Reports req/s, p50/p99, failed requests
+(the old path races on creating the profile) and the hours lost to
+concurrent read-modify-writes.
+
+Writes users, trainings and enrollments: point DATABASE_URL at a scratch
+Postgres database with the schema in place (sqlite cannot RETURNING from
+the joined table in complete_enrollment's UPDATE ... FROM).
+
+    python benchmarks/enrollment_completion.py --concurrency 1 8 32 --requests 400
+"""
+import argparse
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import DBAPIError
+
+from app.db import queries
+from app.db.session import SessionLocal
+from app.enrollments_attendance.models import Enrollment, EnrollmentStatus
+from app.enrollments_attendance.service import complete_enrollment
+from app.gamification.badges_service import award_badges_if_eligible
+from app.profiles.models import LearningProfile, TrainingHistoryEntry
+from app.trainings.models import Training
+from app.users_org.models import User, UserRole
+
+HOURS = 2
+
+
+def legacy_complete(db, enrollment_id: int, user_id: int) -> None:
+    enrollment = queries.enrollment_for_user(db, enrollment_id, user_id)
+    training = queries.training_by_id(db, enrollment.training_id)
+    enrollment.status = EnrollmentStatus.COMPLETED
+    db.add(
+        TrainingHistoryEntry(
+            user_id=user_id,
+            training_id=training.id,
+            status="COMPLETED",
+            completion_date=date.today(),
+            hours_credited=training.duration_hours,
+        )
+    )
+    profile = queries.profile_by_user_id(db, user_id)
+    if not profile:
+        profile = LearningProfile(user_id=user_id)
+        db.add(profile)
+        db.flush()
+    profile.total_learning_hours_current_year += training.duration_hours
+    award_badges_if_eligible(db, user_id, profile.total_learning_hours_current_year)
+
+
+def atomic_complete(db, enrollment_id: int, user_id: int) -> None:
+    complete_enrollment(db, enrollment_id, user_id)
+
+
+def _seed(users: int, per_user: int) -> Tuple[List[int], List[Tuple[int, int]]]:
+    """Fresh users, each enrolled in ``per_user`` trainings; returns (user ids, (enrollment, user) pairs)."""
+    tag = uuid.uuid4().hex[:8]
+    with SessionLocal.begin() as db:
+        user_ids = db.scalars(
+            insert(User).returning(User.id),
+            [
+                {"email": f"bench-{tag}-{i}@example.com", "full_name": "Benchmark", "password_hash": "x", "role": UserRole.EMPLOYEE}
+                for i in range(users)
+            ],
+        ).all()
+        training_ids = db.scalars(
+            insert(Training).returning(Training.id),
+            [{"title": f"Benchmark {tag} {i}", "duration_hours": HOURS, "created_by_id": user_ids[0]} for i in range(per_user)],
+        ).all()
+        enrollments = db.execute(
+            insert(Enrollment).returning(Enrollment.id, Enrollment.user_id),
+            [{"user_id": u, "training_id": t} for t in training_ids for u in user_ids],
+        ).all()
+    return list(user_ids), [tuple(row) for row in enrollments]
+
+
+def _run(path, concurrency: int, requests: int, users: int) -> dict:
+    user_ids, enrollments = _seed(users, -(-requests // users))
+    enrollments = enrollments[:requests]
+
+    def one(item) -> Optional[float]:
+        enrollment_id, user_id = item
+        started = time.perf_counter()
+        try:
+            with SessionLocal.begin() as db:
+                path(db, enrollment_id, user_id)
+        except DBAPIError:
+            return None  # the endpoint would answer 500
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, enrollments))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(r for r in results if r is not None)
+
+    with SessionLocal() as db:
+        credited = db.scalar(
+            select(func.coalesce(func.sum(LearningProfile.total_learning_hours_current_year), 0)).where(
+                LearningProfile.user_id.in_(user_ids)
+            )
+        )
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+        "failed": len(results) - len(latencies),
+        "lost_hours": len(latencies) * HOURS - credited,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        for name, path in (("legacy", legacy_complete), ("atomic", atomic_complete)):
+            result = _run(path, concurrency, args.requests, args.users)
+            print(
+                f"{name:>6} c={concurrency:<4} {result['rps']:8.0f} req/s"
+                f"   p50 {result['p50_ms']:7.1f} ms   p99 {result['p99_ms']:7.1f} ms"
+                f"   failed {result['failed']}   lost hours {result['lost_hours']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/list_projection.py
+"""
+List serialization: the ORM path (hydrate Training objects, validate them
+into TrainingRead, encode the result as FastAPI does for a response_model)
+against the projection path used by list_trainings (select the response
+columns, encode the rows with orjson). Seeds --rows trainings inside a
+transaction that is rolled back, so it can run against any database with
+the schema in place (DATABASE_URL, JWT_SECRET_KEY).
+
+    python benchmarks/list_projection.py --rows 10000 --runs 5
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+
+from app.api.projection import json_rows, projection_columns
+from app.db.session import SessionLocal
+from app.trainings import schemas
+from app.trainings.models import Training
+from app.users_org.models import User, UserRole
+
+TRAINING_LIST = TypeAdapter(List[schemas.TrainingRead])
+
+
+def _seed(db, rows: int) -> None:
+    author_id = db.scalar(
+        insert(User)
+        .values(email="list-benchmark@example.com", full_name="Benchmark", password_hash="x", role=UserRole.ADMIN)
+        .returning(User.id)
+    )
+    db.execute(
+        insert(Training),
+        [{"title": f"Training {i}", "description": "x" * 80, "created_by_id": author_id} for i in range(rows)],
+    )
+
+
+def orm_path(db, rows: int) -> bytes:
+    trainings = db.scalars(select(Training).order_by(Training.id).limit(rows)).all()
+    validated = TRAINING_LIST.validate_python(trainings, from_attributes=True)
+    return json.dumps(TRAINING_LIST.dump_python(validated, mode="json")).encode("utf-8")
+
+
+def projection_path(db, rows: int) -> bytes:
+    stmt = select(*projection_columns(schemas.TrainingRead, Training)).order_by(Training.id).limit(rows)
+    return json_rows(db.execute(stmt).all())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        _seed(db, args.rows)
+        db.flush()
+        for name, path in (("orm", orm_path), ("projection", projection_path)):
+            path(db, args.rows)  # warm up
+            samples = []
+            for _ in range(args.runs):
+                db.expunge_all()
+                started = time.perf_counter()
+                body = path(db, args.rows)
+                samples.append(time.perf_counter() - started)
+            print(
+                f"{name:>10}: {args.rows} rows, {len(body) / 1024:8.0f} KiB"
+                f"   median {statistics.median(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms"
+            )
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/login_latency.py
+"""
+Login latency and its effect on other endpoints. Measures GET /health alone
+(baseline), then again while --login-clients clients log in back to back,
+and reports p50/p99 for the logins and for /health under that load. With
+bcrypt on its own pool, /health under login load should stay close to the
+baseline. Overloaded logins (503) are counted, not timed.
+Run against a started server with an existing, active user:
+
+    python benchmarks/login_latency.py --base-url http://localhost:8000 \\
+        --email user@example.com --password secret --login-clients 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+
+def _summary(name: str, latencies: List[float], rejected: int = 0) -> str:
+    if not latencies:
+        return f"{name:>22}: no samples"
+    latencies = sorted(latencies)
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+    line = (
+        f"{name:>22}: n={len(latencies):<6} p50 {statistics.median(latencies) * 1000:7.1f} ms"
+        f"   p99 {p99 * 1000:7.1f} ms"
+    )
+    return line + (f"   rejected {rejected}" if rejected else "")
+
+
+async def _probe(client: httpx.AsyncClient, path: str, until: float, latencies: List[float]) -> None:
+    while time.perf_counter() < until:
+        started = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def _login(client: httpx.AsyncClient, form: dict, until: float, latencies: List[float], rejected: List[int]) -> None:
+    while time.perf_counter() < until:
+        started = time.perf_counter()
+        response = await client.post("/auth/login", data=form)
+        if response.status_code == 503:
+            rejected.append(1)
+            await asyncio.sleep(0.05)
+            continue
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--login-clients", type=int, default=50)
+    parser.add_argument("--probe-clients", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=20)
+    args = parser.parse_args()
+
+    form = {"username": args.email, "password": args.password}
+    limits = httpx.Limits(max_connections=args.login_clients + args.probe_clients)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        baseline: List[float] = []
+        until = time.perf_counter() + args.seconds / 2
+        await asyncio.gather(*(_probe(client, "/health", until, baseline) for _ in range(args.probe_clients)))
+
+        logins: List[float] = []
+        rejected: List[int] = []
+        under_load: List[float] = []
+        until = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            *(_login(client, form, until, logins, rejected) for _ in range(args.login_clients)),
+            *(_probe(client, "/health", until, under_load) for _ in range(args.probe_clients)),
+        )
+
+    print(_summary("health (baseline)", baseline))
+    print(_summary("login", logins, len(rejected)))
+    print(_summary("health (login load)", under_load))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+# benchmarks/quiz_import.py
+"""
+Quiz import: insert_quizzes (one multi-row INSERT ... RETURNING per table)
+against the previous per-row path (flush after the quiz and after every
+question, options added one by one, then the graph reloaded for the
+response). Imports --questions questions of --options options each, in a
+transaction that is rolled back, so it can run against any database with
+the schema in place. On sqlite SQLAlchemy falls back to row-by-row inserts
+when RETURNING must follow parameter order, so run it against Postgres.
+
+    python benchmarks/quiz_import.py --questions 10000 --options 4 --runs 3
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+
+from app.db.query_counter import count_queries
+from app.db.session import SessionLocal
+from app.gamification import models, schemas
+from app.gamification.quiz_service import insert_quizzes
+from app.trainings.models import Training
+from app.users_org.models import User, UserRole
+
+
+def _training(db) -> int:
+    author_id = db.scalar(
+        insert(User)
+        .values(email="quiz-benchmark@example.com", full_name="Benchmark", password_hash="x", role=UserRole.ADMIN)
+        .returning(User.id)
+    )
+    return db.scalar(insert(Training).values(title="Benchmark", created_by_id=author_id).returning(Training.id))
+
+
+def per_row_path(db, quiz_in: schemas.QuizCreate) -> schemas.QuizRead:
+    quiz = models.Quiz(training_id=quiz_in.training_id, title=quiz_in.title, description=quiz_in.description)
+    db.add(quiz)
+    db.flush()
+    for q in quiz_in.questions:
+        question = models.Question(quiz_id=quiz.id, text=q.text)
+        db.add(question)
+        db.flush()
+        for opt in q.options:
+            db.add(models.Option(question_id=question.id, text=opt.text, is_correct=opt.is_correct))
+    db.flush()
+    quiz = (
+        db.query(models.Quiz)
+        .options(selectinload(models.Quiz.questions).selectinload(models.Question.options))
+        .populate_existing()
+        .filter(models.Quiz.id == quiz.id)
+        .one()
+    )
+    return schemas.QuizRead.model_validate(quiz)
+
+
+def bulk_path(db, quiz_in: schemas.QuizCreate) -> schemas.QuizRead:
+    return insert_quizzes(db, [quiz_in])[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=10000)
+    parser.add_argument("--options", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        training_id = _training(db)
+        quiz_in = schemas.QuizCreate(
+            training_id=training_id,
+            title="Imported quiz",
+            questions=[
+                schemas.QuestionCreate(
+                    text=f"Question {q}",
+                    options=[schemas.OptionCreate(text=f"Option {o}", is_correct=o == 0) for o in range(args.options)],
+                )
+                for q in range(args.questions)
+            ],
+        )
+        for name, path in (("per-row", per_row_path), ("bulk", bulk_path)):
+            samples = []
+            for _ in range(args.runs):
+                savepoint = db.begin_nested()
+                started = time.perf_counter()
+                with count_queries() as counter:
+                    path(db, quiz_in)
+                samples.append(time.perf_counter() - started)
+                savepoint.rollback()
+                db.expunge_all()
+            print(
+                f"{name:>8}: {args.questions} questions x {args.options} options, {counter.count:6} statements"
+                f"   median {statistics.median(samples) * 1000:9.1f} ms   max {max(samples) * 1000:9.1f} ms"
+            )
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/startup.py
+"""
+Worker startup cost: time to import app.main, to build the app, to run the
+lifespan startup (schema check, badge catalog) and the latency of the first
+request. Each sample runs in a fresh interpreter so nothing is already
+imported. Needs the usual environment (DATABASE_URL, JWT_SECRET_KEY).
+
+    python benchmarks/startup.py --runs 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+application = app.main.create_app()
+t2 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(application) as client:
+    t3 = time.perf_counter()
+    client.get("/health")
+    t4 = time.perf_counter()
+    client.get("/health")
+    t5 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "startup_ms": (t3 - t2) * 1000,
+    "first_request_ms": (t4 - t3) * 1000,
+    "second_request_ms": (t5 - t4) * 1000,
+}))
+"""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        out = subprocess.run([sys.executable, "-c", PROBE], check=True, capture_output=True, text=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    for name in samples[0]:
+        values = [s[name] for s in samples]
+        print(f"{name:>18}: median {statistics.median(values):8.1f} ms   max {max(values):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/sync_vs_async.py
+"""
+Sync vs async session layer under concurrency. Each simulated request runs
+the trainings list query (one page) and holds its connection for --db-ms of
+server-side wait (pg_sleep), like a slower query would. The sync path runs
+through the threadpool that serves sync def endpoints (anyio's default 40
+threads); the async path awaits the async session on the event loop. Both
+share the pool settings (DB_POOL_SIZE + DB_MAX_OVERFLOW), so past that
+concurrency both queue on connections, and the sync path also queues on
+threads. Needs a Postgres DATABASE_URL and the asyncpg driver.
+
+    python benchmarks/sync_vs_async.py --concurrency 10 50 200 --requests 2000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+
+from app.db.session import AsyncSessionLocal, SessionLocal, created_async_engines, get_async_engine
+from app.trainings.models import Training
+
+PAGE = select(Training.id, Training.title).order_by(Training.id).limit(50)
+
+
+def _sync_request(db_seconds: float) -> None:
+    with SessionLocal() as db:
+        db.execute(PAGE).all()
+        db.execute(select(func.pg_sleep(db_seconds)))
+
+
+async def _async_request(db_seconds: float) -> None:
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        (await db.execute(PAGE)).all()
+        await db.execute(select(func.pg_sleep(db_seconds)))
+
+
+async def _run(path: str, concurrency: int, requests: int, db_seconds: float) -> dict:
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def client() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            if path == "sync":
+                await run_in_threadpool(_sync_request, db_seconds)
+            else:
+                await _async_request(db_seconds)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--db-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    # warm both pools so connection setup is not measured
+    await _run("sync", 4, 20, 0)
+    await _run("async", 4, 20, 0)
+    for concurrency in args.concurrency:
+        for path in ("sync", "async"):
+            result = await _run(path, concurrency, args.requests, args.db_ms / 1000)
+            print(
+                f"{path:>5} c={concurrency:<4} {result['rps']:8.0f} req/s"
+                f"   p50 {result['p50_ms']:7.1f} ms   p99 {result['p99_ms']:7.1f} ms"
+            )
+    for engine in created_async_engines().values():
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+# gunicorn.conf.py
+# Usage: gunicorn -c gunicorn.conf.py
+import multiprocessing
+import os
+
+wsgi_app = "app.main:create_preloaded_app()"
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# Import and build the app once in the master; workers share it copy-on-write
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Never reuse pooled connections inherited from the master
+    from app.db.session import created_async_engines, engine, replica_engine
+
+    for sync_engine in {engine, replica_engine, *(e.sync_engine for e in created_async_engines().values())}:
+        sync_engine.dispose(close=False)
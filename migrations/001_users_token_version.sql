@@ -0,0 +1,19 @@
+-- migrations/001_users_token_version.sql
+--
+-- Columns added to users for token revocation (app.auth.revocation).
+-- Databases created before them fail startup with SchemaDriftError
+-- ("users: missing column token_version"); apply once with
+--
+--     psql "$DATABASE_URL" -f migrations/001_users_token_version.sql
+--
+-- The defaults stay in place so workers still running the previous release
+-- can keep inserting users during a rolling deploy.
+
+BEGIN;
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+    DEFAULT (now() AT TIME ZONE 'utc');
+CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at);
+
+COMMIT;
@@ -0,0 +1,26 @@
+-- migrations/002_user_badges_unique.sql
+--
+-- Badge awards became idempotent (ON CONFLICT on user_id, badge_id), which
+-- needs the unique constraint below. Databases created before it fail
+-- startup with SchemaDriftError ("user_badges: missing unique constraint
+-- uq_user_badges_user_badge"); apply once with
+--
+--     psql "$DATABASE_URL" -f migrations/002_user_badges_unique.sql
+--
+-- Concurrent completions could award the same badge twice before, so the
+-- duplicates are removed first, keeping the earliest award.
+
+BEGIN;
+
+LOCK TABLE user_badges IN SHARE ROW EXCLUSIVE MODE;
+
+DELETE FROM user_badges AS later
+USING user_badges AS earlier
+WHERE later.user_id = earlier.user_id
+  AND later.badge_id = earlier.badge_id
+  AND later.id > earlier.id;
+
+ALTER TABLE user_badges
+    ADD CONSTRAINT uq_user_badges_user_badge UNIQUE (user_id, badge_id);
+
+COMMIT;
@@ -0,0 +1,31 @@
+# tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when app modules are imported, so configure them first
+_db_dir = tempfile.mkdtemp(prefix="lnd-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/test.db")
+if os.environ["DATABASE_URL"].startswith("sqlite"):
+    # async endpoints need an async driver for the same file
+    os.environ.setdefault("ASYNC_DATABASE_URL", f"sqlite+aiosqlite:///{_db_dir}/test.db")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ["QUERY_BUDGET_ENFORCED"] = "true"
+os.environ["OUTBOX_WORKER_ENABLED"] = "false"
+
+
+@pytest.fixture
+def db():
+    from app.core.db_init import import_models
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+
+    import_models()
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,62 @@
+# tests/test_auth.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app.auth import hashing
+from app.auth.router import login
+from app.auth.security import UNUSABLE_PASSWORD, hash_password
+from app.users_org.models import User, UserRole
+
+
+@pytest.fixture
+def verified(monkeypatch):
+    calls = []
+    original = hashing.verify_password
+
+    def verify_password(password, password_hash):
+        calls.append(password_hash)
+        return original(password, password_hash)
+
+    monkeypatch.setattr(hashing, "verify_password", verify_password)
+    return calls
+
+
+def _login(db, email, password):
+    form = OAuth2PasswordRequestForm(username=email, password=password)
+    return asyncio.run(login(form_data=form, db=db))
+
+
+def _user(db, email, password_hash, is_active=True):
+    user = User(email=email, full_name="U", password_hash=password_hash, role=UserRole.EMPLOYEE, is_active=is_active)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_login_succeeds_for_active_user(db, verified):
+    _user(db, "a@example.com", hash_password("secret"))
+
+    assert _login(db, "a@example.com", "secret")["token_type"] == "bearer"
+
+
+@pytest.mark.parametrize("is_active", [True, False])
+def test_rejected_logins_still_check_the_password(db, verified, is_active):
+    password_hash = hash_password("secret")
+    _user(db, "a@example.com", password_hash, is_active=is_active)
+    _user(db, "sync@example.com", UNUSABLE_PASSWORD)
+
+    attempts = [("nobody@example.com", "secret"), ("sync@example.com", "secret"), ("a@example.com", "wrong")]
+    if not is_active:
+        attempts.append(("a@example.com", "secret"))
+    for email, password in attempts:
+        with pytest.raises(HTTPException) as exc:
+            _login(db, email, password)
+        assert exc.value.status_code == 401
+
+    # one bcrypt per attempt, never the instant "!" check
+    assert len(verified) == len(attempts)
+    assert not any(h.startswith(UNUSABLE_PASSWORD) for h in verified)
+    assert verified[-1] == password_hash
@@ -0,0 +1,16 @@
+# tests/test_certificates.py
+import pytest
+
+from app.certificates import templates
+
+FIELDS = {"recipient": "Ada Lovelace", "meta": "Gold badge", "issued": "Issued 2024-01-01"}
+
+
+def test_png_rendering_available():
+    # Pillow is a runtime requirement; without it every PNG download is a 501
+    assert templates.png_supported()
+
+
+@pytest.mark.parametrize("fmt,signature", [(templates.PDF, b"%PDF"), (templates.PNG, b"\x89PNG")])
+def test_render(fmt, signature):
+    assert templates.render(fmt, "GOLD", FIELDS).startswith(signature)
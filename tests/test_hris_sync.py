@@ -0,0 +1,69 @@
+# tests/test_hris_sync.py
+import io
+
+from app.users_org.models import Department, User, UserRole
+from app.users_org.sync import FeedFormat, iter_records, sync_users
+
+
+def _feed(text: str):
+    return iter_records(io.StringIO(text), FeedFormat.CSV)
+
+
+def _seed(db):
+    eng = Department(name="Eng")
+    db.add(eng)
+    db.flush()
+    db.add_all(
+        [
+            User(email="e1@example.com", full_name="E One", password_hash="x",
+                 role=UserRole.MANAGER, department_id=eng.id, is_active=True, token_version=0),
+            User(email="e2@example.com", full_name="E Two", password_hash="x",
+                 role=UserRole.EMPLOYEE, department_id=eng.id, is_active=False, token_version=3),
+        ]
+    )
+    db.commit()
+    return eng
+
+
+def test_partial_feed_keeps_unlisted_columns(db):
+    eng = _seed(db)
+
+    report = sync_users(db, _feed("email,full_name\ne1@example.com,E One\ne2@example.com,E Two\n"))
+    db.commit()
+
+    assert report.updated == 0
+    assert report.unchanged == 2
+    e1, e2 = db.query(User).order_by(User.email).all()
+    assert (e1.role, e1.department_id, e1.is_active) == (UserRole.MANAGER, eng.id, True)
+    assert (e2.department_id, e2.is_active, e2.token_version) == (eng.id, False, 3)
+
+
+def test_empty_values_keep_current_values_and_new_users_get_defaults(db):
+    eng = _seed(db)
+
+    report = sync_users(
+        db,
+        _feed(
+            "email,full_name,role,department,is_active\n"
+            "e1@example.com,E One Renamed,,,\n"
+            "new@example.com,New Person,,,\n"
+        ),
+    )
+    db.commit()
+
+    assert (report.inserted, report.updated) == (1, 1)
+    e1 = db.query(User).filter_by(email="e1@example.com").one()
+    assert (e1.full_name, e1.department_id, e1.is_active, e1.token_version) == ("E One Renamed", eng.id, True, 0)
+    new = db.query(User).filter_by(email="new@example.com").one()
+    assert (new.role, new.department_id, new.is_active) == (UserRole.EMPLOYEE, None, True)
+
+
+def test_explicit_values_still_apply(db):
+    _seed(db)
+
+    report = sync_users(db, _feed("email,full_name,is_active\ne1@example.com,E One,false\n"))
+    db.commit()
+
+    assert report.updated == 1
+    e1 = db.query(User).filter_by(email="e1@example.com").one()
+    assert (e1.is_active, e1.token_version) == (False, 1)
@@ -0,0 +1,196 @@
+# tests/test_query_budgets.py
+"""
+The quiz endpoints must run a constant number of statements however many
+questions and options a quiz has. Each endpoint is called with its
+@query_budget enforced, and the undecorated body is counted to check that
+the count does not grow with the quiz size. The profile endpoint is checked
+on first access, before any profile row exists.
+"""
+import asyncio
+import importlib.util
+
+import pytest
+from fastapi import Response
+from starlette.requests import Request
+
+from app.auth import cache as auth_cache
+from app.db.query_counter import count_queries
+from app.db.session import AsyncSessionLocal, created_async_engines, engine, get_async_engine
+from app.db.versions import profile_key, quizzes_key, versions
+from app.gamification import models, schemas
+from app.gamification.answer_keys import answer_keys
+from app.gamification.router import create_quiz, list_quizzes_for_training, submit_quiz
+from app.profiles import models as profile_models
+from app.profiles.router import get_my_profile
+from app.trainings.models import Training
+from app.users_org.models import User, UserRole
+
+
+# sqlite cannot return ids in parameter order from one multi-row INSERT, so
+# SQLAlchemy inserts row by row there; run with a Postgres DATABASE_URL
+postgres_only = pytest.mark.skipif(
+    engine.dialect.name != "postgresql", reason="needs multi-row INSERT ... RETURNING"
+)
+
+needs_async_driver = pytest.mark.skipif(
+    engine.dialect.name == "sqlite" and importlib.util.find_spec("aiosqlite") is None,
+    reason="async endpoints on sqlite need aiosqlite",
+)
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+
+
+def _seed(db, questions: int, options: int):
+    user = User(
+        email="learner@example.com",
+        full_name="Learner",
+        password_hash="x",
+        role=UserRole.EMPLOYEE,
+    )
+    db.add(user)
+    db.flush()
+    training = Training(title="Safety", created_by_id=user.id)
+    db.add(training)
+    db.flush()
+    quiz = models.Quiz(
+        training_id=training.id,
+        title="Safety quiz",
+        questions=[
+            models.Question(
+                text=f"Question {q}",
+                options=[models.Option(text=f"Option {o}", is_correct=o == 0) for o in range(options)],
+            )
+            for q in range(questions)
+        ],
+    )
+    db.add(quiz)
+    db.commit()
+    # endpoints receive the detached identity get_current_user returns
+    return auth_cache.cache_user(user), training, quiz
+
+
+def _sheet(quiz):
+    return schemas.QuizSubmissionCreate(answers={q.id: q.options[0].id for q in quiz.questions})
+
+
+def _cold(db, training, quiz) -> None:
+    answer_keys.invalidate(quiz.id)
+    versions.forget([quizzes_key(training.id)])
+    db.expire_all()
+
+
+@pytest.mark.parametrize("questions,options", [(1, 1), (25, 4)])
+def test_list_quizzes_for_training_within_budget(db, questions, options):
+    user, training, _ = _seed(db, questions, options)
+
+    result = list_quizzes_for_training(training.id, _request(), Response(), db=db)
+
+    assert len(result) == 1
+    assert len(result[0].questions) == questions
+    assert all(len(q.options) == options for q in result[0].questions)
+
+
+@pytest.mark.parametrize("questions,options", [(1, 1), (25, 4)])
+def test_submit_quiz_within_budget(db, questions, options):
+    user, training, quiz = _seed(db, questions, options)
+    sheet = _sheet(quiz)
+    _cold(db, training, quiz)
+
+    submission = submit_quiz(quiz.id, sheet, db=db, current_user=user)
+
+    assert submission.score == questions
+    assert submission.max_score == questions
+    assert submission.passed
+
+
+def _statements(db, questions: int, options: int):
+    user, training, quiz = _seed(db, questions, options)
+    sheet = _sheet(quiz)
+
+    _cold(db, training, quiz)
+    with count_queries() as listing:
+        list_quizzes_for_training.__wrapped__(training.id, _request(), Response(), db=db)
+
+    _cold(db, training, quiz)
+    with count_queries() as submitting:
+        submit_quiz.__wrapped__(quiz.id, sheet, db=db, current_user=user)
+    db.rollback()
+    return listing.count, submitting.count
+
+
+def test_query_count_does_not_grow_with_quiz_size(db):
+    small = _statements(db, 1, 1)
+    db.query(models.QuizSubmission).delete()
+    db.query(models.Option).delete()
+    db.query(models.Question).delete()
+    db.query(models.Quiz).delete()
+    db.query(Training).delete()
+    db.query(User).delete()
+    db.commit()
+    large = _statements(db, 25, 4)
+
+    assert small == large
+
+
+@pytest.mark.parametrize("questions,options", [(1, 1), pytest.param(25, 4, marks=postgres_only)])
+def test_create_quiz_within_budget(db, questions, options):
+    user, training, _ = _seed(db, 1, 1)
+    quiz_in = schemas.QuizCreate(
+        training_id=training.id,
+        title="Another quiz",
+        questions=[
+            schemas.QuestionCreate(
+                text=f"Question {q}",
+                options=[schemas.OptionCreate(text=f"Option {o}", is_correct=o == 0) for o in range(options)],
+            )
+            for q in range(questions)
+        ],
+    )
+    db.expire_all()
+
+    with count_queries() as counter:
+        created = create_quiz.__wrapped__(quiz_in, db=db)
+    db.rollback()
+    result = create_quiz(quiz_in, db=db)
+
+    # training lookup, one INSERT per table, version bump
+    assert counter.count == 5
+    assert len(result.questions) == len(created.questions) == questions
+
+
+def _my_profile(user):
+    async def run():
+        try:
+            async with AsyncSessionLocal(bind=get_async_engine()) as session:
+                return await get_my_profile(_request(), Response(), db=session, current_user=user)
+        finally:
+            # connections belong to this event loop
+            for async_engine in created_async_engines().values():
+                await async_engine.dispose()
+
+    versions.forget([profile_key(user.id)])
+    return asyncio.run(run())
+
+
+@needs_async_driver
+def test_get_my_profile_first_access_within_budget(db):
+    user, _, _ = _seed(db, 1, 1)
+
+    profile = _my_profile(user)
+
+    assert (profile.user_id, profile.total_learning_hours_current_year) == (user.id, 0)
+    # reading the profile does not create it
+    assert db.query(profile_models.LearningProfile).count() == 0
+
+
+@needs_async_driver
+def test_get_my_profile_existing_within_budget(db):
+    user, _, _ = _seed(db, 1, 1)
+    db.add(profile_models.LearningProfile(user_id=user.id, tech_stack="python", total_learning_hours_current_year=12))
+    db.commit()
+
+    profile = _my_profile(user)
+
+    assert (profile.tech_stack, profile.total_learning_hours_current_year) == ("python", 12)
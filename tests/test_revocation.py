@@ -0,0 +1,47 @@
+# tests/test_revocation.py
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.auth.revocation import WATERMARK_OVERLAP, TokenRevocations
+from app.users_org.models import User, UserRole
+
+
+def _user(db, email, **values):
+    user = User(email=email, full_name="U", password_hash="x", role=UserRole.EMPLOYEE, **values)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_first_load_reads_revoked_and_inactive_users(db):
+    revoked = _user(db, "revoked@example.com", token_version=2)
+    inactive = _user(db, "inactive@example.com", is_active=False)
+    active = _user(db, "active@example.com")
+    revocations = TokenRevocations(refresh_seconds=0)
+
+    assert revocations.is_revoked(revoked.id, 1)
+    assert not revocations.is_revoked(revoked.id, 2)
+    assert revocations.is_revoked(inactive.id, 0)
+    assert not revocations.is_revoked(active.id, 0)
+
+
+def test_refresh_reads_only_users_updated_since_the_last_one(db):
+    user = _user(db, "u@example.com")
+    revocations = TokenRevocations(refresh_seconds=0)
+    assert not revocations.is_revoked(user.id, 0)
+
+    # written by another worker; bulk updates by primary key stamp updated_at too
+    db.execute(update(User), [{"id": user.id, "is_active": False, "token_version": 1}])
+    stale = datetime.utcnow() - WATERMARK_OVERLAP - timedelta(minutes=1)
+    old = _user(db, "old@example.com", is_active=False, updated_at=stale)
+    db.commit()
+
+    assert revocations.is_revoked(user.id, 1)
+    assert not revocations.is_revoked(old.id, 0)
+
+    user.is_active = True
+    db.commit()
+
+    assert not revocations.is_revoked(user.id, 1)
+    assert revocations.is_revoked(user.id, 0)
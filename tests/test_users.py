@@ -0,0 +1,46 @@
+# tests/test_users.py
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.users_org import schemas
+from app.users_org.models import Department, User, UserRole
+from app.users_org.router import update_user
+
+
+@pytest.mark.parametrize("field", ["full_name", "role", "is_active"])
+def test_user_update_rejects_explicit_null(field):
+    with pytest.raises(ValidationError):
+        schemas.UserUpdate(**{field: None})
+
+
+def test_user_update_allows_omitted_fields_and_null_department():
+    changes = schemas.UserUpdate(department_id=None).model_dump(exclude_unset=True)
+    assert changes == {"department_id": None}
+
+
+def _user(db):
+    eng = Department(name="Eng")
+    db.add(eng)
+    db.flush()
+    user = User(email="e1@example.com", full_name="E One", password_hash="x", role=UserRole.EMPLOYEE, department_id=eng.id)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_update_user_unknown_department_is_422(db):
+    user = _user(db)
+
+    with pytest.raises(HTTPException) as exc:
+        update_user(user.id, schemas.UserUpdate(department_id=999), db=db)
+
+    assert exc.value.status_code == 422
+
+
+def test_update_user_clears_department(db):
+    user = _user(db)
+
+    updated = update_user(user.id, schemas.UserUpdate(department_id=None), db=db)
+
+    assert updated.department_id is None